@@ -0,0 +1,83 @@
+import hashlib
+import json
+
+
+ENDPOINT = "/v1/chat/completions"
+
+
+def request_digest(request):
+    """Short hash of a request, so answers to a prompt that has since changed are not ingested."""
+    raw = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def custom_id(spec, system, iteration, base_idx, size, request):
+    """Stable request ID naming the run, the system, the iteration, the rows of the chunk and the request."""
+    return f"{spec}:{system}:{iteration}:{base_idx}:{size}:{request_digest(request)}"
+
+
+def parse_custom_id(value):
+    spec, system, iteration, base_idx, size, digest = value.rsplit(":", 5)
+    return spec, system, int(iteration), int(base_idx), int(size), digest
+
+
+def write_requests(path, entries):
+    """Write (custom_id, chat completion kwargs) pairs as a batch input file, returns the count."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for cid, request in entries:
+            f.write(json.dumps({"custom_id": cid, "method": "POST", "url": ENDPOINT, "body": request}) + "\n")
+            count += 1
+    return count
+
+
+def read_results(path):
+    """Yield (custom_id, content, error) for every line of a batch output or error file.
+
+    The file is streamed, one line in memory at a time. `content` is the
+    message text of a successful request and None otherwise, with `error`
+    saying why. Lines that are not JSON are reported and skipped.
+    """
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️ Skipping line {number} of {path}: {e}")
+                continue
+
+            response = obj.get("response") or {}
+            body = response.get("body") or {}
+            error = obj.get("error")
+            content = None
+            if response.get("status_code") == 200 and body.get("choices"):
+                content = (body["choices"][0]["message"].get("content") or "").strip()
+            elif error is None:
+                error = body.get("error") or f"status {response.get('status_code')}"
+            if isinstance(error, dict):
+                error = error.get("message") or json.dumps(error)
+            yield obj["custom_id"], content, error
+
+
+def fabricate_results(requests_path, output_path, answer):
+    """Write a batch output file for a batch input file without the API, returns the count.
+
+    `answer(custom_id, body)` gives the message text of a request, or None for
+    a failed request. Used to exercise batch ingestion on known answers.
+    """
+    count = 0
+    with open(requests_path, encoding="utf-8") as src, open(output_path, "w", encoding="utf-8") as out:
+        for line in src:
+            if not line.strip():
+                continue
+            obj = json.loads(line)
+            content = answer(obj["custom_id"], obj["body"])
+            if content is None:
+                response = {"status_code": 500, "body": {"error": {"message": "fabricated failure"}}}
+            else:
+                response = {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}}
+            out.write(json.dumps({"custom_id": obj["custom_id"], "response": response, "error": None}) + "\n")
+            count += 1
+    return count
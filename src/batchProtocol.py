@@ -0,0 +1,121 @@
+import json
+import re
+
+
+MIN_CHUNK_SIZE = 1
+MAX_CHUNK_SIZE = 15
+# Shrink the chunks when more than this share of the requested IDs is missing from answers
+MAX_FAILURE_RATE = 0.2
+# Keep the expected answer within this share of the completion token limit
+TOKEN_BUDGET = 0.5
+SMOOTHING = 0.3  # weight of the newest chunk in the running averages
+
+FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+# "ID": "formula" pairs, also inside truncated or otherwise broken JSON
+JSON_PAIR = re.compile(r'"((?:[^"\\]|\\.)*)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+ID_LINE = re.compile(r"^\s*(?:[-*]\s*)?[\"'`]?(?P<id>[^:\"'`]+?)[\"'`]?\s*(?::|=>|->|—|-)\s+(?P<formula>.+?)\s*,?\s*$")
+
+
+def format_requirements(ids, descriptions):
+    return "".join(f"{req_id}: {desc}\n" for req_id, desc in zip(ids, descriptions))
+
+
+def _unescape(text):
+    try:
+        return json.loads(f'"{text}"')
+    except json.JSONDecodeError:
+        return text
+
+
+def _from_object(obj, wanted):
+    """Entries of a decoded JSON answer: {"ID": "formula"}, or a list of {"id": ..., "formula": ...}."""
+    found = {}
+    if isinstance(obj, dict):
+        # {"formulas": {...}} and similar wrappers
+        if not wanted & set(obj) and len(obj) == 1 and isinstance(next(iter(obj.values())), (dict, list)):
+            return _from_object(next(iter(obj.values())), wanted)
+        for key, value in obj.items():
+            if key in wanted and isinstance(value, str):
+                found[key] = value
+    elif isinstance(obj, list):
+        for item in obj:
+            if not isinstance(item, dict):
+                continue
+            key = item.get("id", item.get("ID"))
+            value = item.get("formula", item.get("ptLTL", item.get("ltl")))
+            if key in wanted and isinstance(value, str):
+                found[key] = value
+    return found
+
+
+def parse_batch(text, ids):
+    """Formulas by requirement ID from a batch answer, salvaging what a malformed answer holds.
+
+    Tries, in order: the answer (or its fenced code block) as JSON, "ID": "formula"
+    pairs anywhere in the text, "ID: formula" lines, and finally, if nothing is
+    keyed but the number of lines matches, the old one-formula-per-line protocol.
+    IDs without a non-empty formula are missing from the result.
+    """
+    wanted = set(ids)
+    fenced = FENCE.search(text)
+    body = fenced.group(1) if fenced else text
+
+    found = {}
+    try:
+        found = _from_object(json.loads(body), wanted)
+    except json.JSONDecodeError:
+        pass
+
+    if not found:
+        for key, value in JSON_PAIR.findall(body):
+            key = _unescape(key)
+            if key in wanted:
+                found.setdefault(key, _unescape(value))
+
+    if not found:
+        for line in body.splitlines():
+            m = ID_LINE.match(line)
+            if m and m.group("id").strip() in wanted:
+                found.setdefault(m.group("id").strip(), m.group("formula"))
+
+    if not found:
+        lines = [line.strip() for line in body.splitlines() if line.strip()]
+        if len(lines) == len(ids):
+            found = dict(zip(ids, lines))
+
+    return {key: value.strip() for key, value in found.items() if value.strip()}
+
+
+class ChunkSizer:
+    """Chunk size adapted to how reliably, and how verbosely, the model answers.
+
+    Grows by one after a complete answer, halves when the smoothed share of
+    missing IDs exceeds MAX_FAILURE_RATE, and never asks for more output
+    than TOKEN_BUDGET of the completion limit by the observed tokens per formula.
+    """
+
+    def __init__(self, size, max_completion_tokens, max_size=MAX_CHUNK_SIZE):
+        self.size = size
+        self.max_size = max_size
+        self.max_completion_tokens = max_completion_tokens
+        self.failure_rate = 0.0
+        self.tokens_per_formula = None
+
+    def record(self, requested, missing, output_tokens):
+        if requested == 0:
+            return
+        self.failure_rate = (1 - SMOOTHING) * self.failure_rate + SMOOTHING * missing / requested
+        answered = requested - missing
+        if answered:
+            per_formula = output_tokens / answered
+            self.tokens_per_formula = per_formula if self.tokens_per_formula is None else (
+                (1 - SMOOTHING) * self.tokens_per_formula + SMOOTHING * per_formula
+            )
+
+        if self.failure_rate > MAX_FAILURE_RATE:
+            self.size = max(MIN_CHUNK_SIZE, self.size // 2)
+        elif missing == 0:
+            self.size = min(self.max_size, self.size + 1)
+        if self.tokens_per_formula:
+            fits = int(TOKEN_BUDGET * self.max_completion_tokens / self.tokens_per_formula)
+            self.size = max(MIN_CHUNK_SIZE, min(self.size, fits))
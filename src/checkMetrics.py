@@ -0,0 +1,91 @@
+import json
+import re
+import sys
+import threading
+
+
+# Appended to a nuXmv session or script after the checks to collect resource usage
+STATS_COMMANDS = ["print_usage", "print_bdd_stats"]
+
+STAT_PATTERNS = {
+    "user_seconds": r"User time\s+([\d.]+)",
+    "system_seconds": r"System time\s+([\d.]+)",
+    "peak_rss_kb": r"Maximum resident size\s*=\s*(\d+)K",
+    "bdd_peak_nodes": r"Peak number of nodes:\s*(\d+)",
+    "bdd_peak_live_nodes": r"Peak number of live nodes:\s*(\d+)",
+    "bdd_variables": r"Number of BDD variables:\s*(\d+)",
+    "reorderings": r"Number of reorderings:\s*(\d+)",
+    "reorder_seconds": r"Time for reordering:\s*([\d.]+)",
+}
+# Totals since the nuXmv process started, a long-lived session needs their difference per check
+CUMULATIVE = ("user_seconds", "system_seconds", "reorderings", "reorder_seconds")
+
+
+def parse_stats(text):
+    """nuXmv resource figures from `print_usage` / `print_bdd_stats` output (last value of each)."""
+    stats = {}
+    for name, pattern in STAT_PATTERNS.items():
+        found = re.findall(pattern, text)
+        if found:
+            stats[name] = float(found[-1]) if "." in found[-1] else int(found[-1])
+    return stats
+
+
+def stats_delta(before, after):
+    delta = dict(after)
+    for name in CUMULATIVE:
+        if name in after and name in before:
+            delta[name] = round(after[name] - before[name], 6)
+    return delta
+
+
+class MetricsRecorder:
+    """Appends one JSON object per check to a metrics file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def record(self, **fields):
+        line = json.dumps(fields, default=str)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(path, top=5):
+    """Print the slowest requirements per system, by total wall time over all their checks."""
+    records = load(path)
+    systems = {}
+    for r in records:
+        key = r.get("requirement") or r.get("reference")
+        entry = systems.setdefault(r["system"], {}).setdefault(key, {"checks": 0, "wall": 0.0, "cpu": 0.0, "nodes": 0})
+        entry["checks"] += 1
+        entry["wall"] += r.get("wall_seconds", 0.0)
+        entry["cpu"] += r.get("nuxmv_user_seconds", 0.0) + r.get("nuxmv_system_seconds", 0.0)
+        entry["nodes"] = max(entry["nodes"], r.get("nuxmv_bdd_peak_nodes", 0))
+
+    for system, requirements in systems.items():
+        total = sum(e["wall"] for e in requirements.values())
+        print(f"{system}: {sum(e['checks'] for e in requirements.values())} checks, {total:.1f} s wall")
+        slowest = sorted(requirements.items(), key=lambda item: item[1]["wall"], reverse=True)[:top]
+        for requirement, e in slowest:
+            print(
+                f"  {requirement}: {e['wall']:.2f} s wall over {e['checks']} checks, "
+                f"{e['cpu']:.2f} s nuXmv CPU, {e['nodes']} peak BDD nodes"
+            )
+
+
+if __name__ == "__main__":
+    # Usage: python checkMetrics.py results/<run>_metrics.jsonl [top]
+    summarize(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 5)
@@ -0,0 +1,124 @@
+import re
+import ltlParser
+import modelSlicer
+
+
+RANGE = re.compile(r"^(-?\d+)\s*\.\.\s*(-?\d+)$")
+
+
+def comparison_atoms(nodes):
+    """Constants each variable is compared against, variable-variable comparisons,
+    and variables used in any other way (arithmetic, bare, real constants)."""
+    constants, pairs, unsafe = {}, set(), set()
+
+    def visit(node):
+        if node.op in ltlParser.COMPARISONS:
+            a, b = node.args
+            if a.op == "var" and b.op == "var":
+                pairs.add((a.value, b.value))
+                return
+            for v, c in ((a, b), (b, a)):
+                if v.op == "var" and c.op == "num" and isinstance(c.value, int):
+                    constants.setdefault(v.value, set()).add(c.value)
+                    return
+        if node.op == "var":
+            unsafe.add(node.value)
+        for arg in node.args:
+            visit(arg)
+
+    for node in nodes:
+        visit(node)
+    return constants, pairs, unsafe
+
+
+def components(names, pairs):
+    parent = {n: n for n in names}
+
+    def find(n):
+        while parent[n] != n:
+            parent[n] = parent[parent[n]]
+            n = parent[n]
+        return n
+
+    for a, b in pairs:
+        parent[find(a)] = find(b)
+    groups = {}
+    for n in names:
+        groups.setdefault(find(n), set()).add(n)
+    return list(groups.values())
+
+
+def representatives(thresholds, width):
+    """Every threshold plus up to `width` consecutive values after each one.
+
+    Any assignment of `width` variables maps onto these values by an
+    order-preserving map that fixes the thresholds, so every comparison
+    between the variables and against the constants keeps its truth value.
+    """
+    points = sorted(thresholds)
+    values = set(points)
+    for lo, hi in zip(points, points[1:]):
+        values.update(range(lo + 1, min(hi, lo + 1 + width)))
+    return values
+
+
+def reduced_domains(model, formulas):
+    """Minimal integer domains for the ranged variables of `model` that the formulas
+    only compare against integer constants or against each other.
+
+    Returns {name: sorted values}; an empty dict if a formula does not parse.
+    """
+    variables, defines = modelSlicer.parse_model(model)
+    try:
+        nodes = [ltlParser.parse(f) for f in formulas]
+        nodes += [ltlParser.parse(expr) for expr in defines.values()]
+    except ltlParser.ParseError:
+        return {}
+
+    ranges = {}
+    for name, (_, typ, _) in variables.items():
+        m = RANGE.match(typ)
+        if m:
+            ranges[name] = (int(m.group(1)), int(m.group(2)))
+
+    constants, pairs, unsafe = comparison_atoms(nodes)
+    used = set(constants) | {n for p in pairs for n in p}
+    reduced = {}
+    for group in components(used, pairs):
+        if not group <= set(ranges) or group & unsafe:
+            continue
+        thresholds = set()
+        for name in group:
+            lo, hi = ranges[name]
+            thresholds |= {lo, hi} | {c for c in constants.get(name, ()) if lo <= c <= hi}
+        values = representatives(thresholds, len(group))
+        for name in group:
+            lo, hi = ranges[name]
+            domain = sorted(v for v in values if lo <= v <= hi)
+            if len(domain) < hi - lo + 1:
+                reduced[name] = domain
+    return reduced
+
+
+def abstract_model(model, formulas):
+    """Rewrite the ranged declarations of `model` to their reduced domains.
+
+    Returns (model, reductions) with reductions mapping name -> (old size, new size).
+    """
+    reduced = reduced_domains(model, formulas)
+    if not reduced:
+        return model, {}
+
+    variables, _ = modelSlicer.parse_model(model)
+    reductions = {}
+    lines = []
+    for line in model.split("\n"):
+        decl = line.split("--")[0].strip()
+        name = decl.split(":")[0].strip() if ":" in decl and ":=" not in decl else None
+        if name in reduced:
+            lo, hi = (int(x) for x in RANGE.match(variables[name][1]).groups())
+            values = ", ".join(str(v) for v in reduced[name])
+            line = line.replace(variables[name][1], "{" + values + "}", 1)
+            reductions[name] = (hi - lo + 1, len(reduced[name]))
+        lines.append(line)
+    return "\n".join(lines), reductions
@@ -0,0 +1,95 @@
+import concurrent.futures
+import threading
+import time
+import os
+
+
+NUM_WORKERS = int(os.environ.get("EQUIV_WORKERS", os.cpu_count() or 1))
+
+
+class EquivalenceExecutor:
+    """Bounded worker pool for equivalence checks.
+
+    Threads only overlap the checks that reach nuXmv subprocesses; pairs decided
+    in Python (trace replay, ptLTL engine, fuzzing) hold the GIL and run one at a
+    time whatever the worker count.
+    `submit` blocks once `max_queue` jobs are waiting or running, and results
+    are handed back in submission order so running counters stay correct.
+    `job_timeout` counts from submission; a job past it is given up on, but its
+    thread cannot be stopped, so `close` leaves it to finish in the background.
+    """
+
+    def __init__(self, workers=NUM_WORKERS, max_queue=None, job_timeout=None):
+        self.workers = max(1, workers)
+        self.job_timeout = job_timeout
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+        self.slots = threading.BoundedSemaphore(max_queue or 4 * self.workers)
+        self.pending = []
+        self.latencies = []
+        self.checks = 0
+        self.timeouts = 0
+        self.abandoned = False
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def _run(self, fn, args, weight):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.latencies.append(elapsed / weight)
+                self.checks += weight
+            self.slots.release()
+
+    def submit(self, fn, *args, weight=1, default=None):
+        """Queue `fn(*args)`. `weight` is the number of checks the job covers,
+        `default` is what `results` returns for it after a timeout."""
+        self.slots.acquire()
+        future = self.pool.submit(self._run, fn, args, max(1, weight))
+        deadline = None if self.job_timeout is None else time.perf_counter() + self.job_timeout
+        self.pending.append((future, default, deadline))
+        return future
+
+    def results(self):
+        """Wait for every submitted job and return the results in submission order."""
+        out = []
+        for future, default, deadline in self.pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            try:
+                out.append(future.result(timeout=timeout))
+            except concurrent.futures.TimeoutError:
+                print("⏳ Equivalence job timed out — counted as no verdict")
+                future.cancel()
+                with self.lock:
+                    self.timeouts += 1
+                self.abandoned = True
+                out.append(default)
+        self.pending = []
+        return out
+
+    def map(self, fn, arg_tuples):
+        for args in arg_tuples:
+            self.submit(fn, *args)
+        return self.results()
+
+    def report(self):
+        with self.lock:
+            lat = sorted(self.latencies)
+            checks = self.checks
+        elapsed = time.perf_counter() - self.started
+        if not lat:
+            print("Equivalence executor: no checks run")
+            return
+        p50 = lat[len(lat) // 2]
+        p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+        print(
+            f"Equivalence executor ({self.workers} workers): {checks} checks in {elapsed:.1f} s, "
+            f"{checks / elapsed:.2f} checks/s, p50 {1000 * p50:.1f} ms, p95 {1000 * p95:.1f} ms per check, "
+            f"{self.timeouts} timeouts"
+        )
+
+    def close(self):
+        # Don't block on jobs that already timed out, just drop what has not started
+        self.pool.shutdown(wait=not self.abandoned, cancel_futures=self.abandoned)
@@ -0,0 +1,71 @@
+import re
+import difflib
+from typing import NamedTuple
+import ltlParser
+
+
+LATEX = re.compile(r"\\[A-Za-z]+|\$|\\[()\[\]]")
+# Array indexing is valid nuXmv but outside the parser's grammar
+ARRAY_INDEX = re.compile(r"[A-Za-z_][A-Za-z0-9_$#.]*\s*\[\s*[A-Za-z0-9_]+\s*\]")
+
+
+class Problem(NamedTuple):
+    kind: str  # "syntax", "future" or "undeclared"
+    message: str
+
+
+def check_parentheses(formula):
+    depth = 0
+    for pos, ch in enumerate(formula):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth < 0:
+                return f"Unmatched ')' at position {pos}"
+    if depth > 0:
+        return f"{depth} unclosed '('"
+    return None
+
+
+def validate(formula, identifiers=None, dialect="nuxmv", allow_future=True):
+    """Check a formula without a model checker.
+
+    `identifiers` is the set of names the formula may use (None skips the
+    check), `allow_future=False` rejects G, F, X and U as in ptLTL mode.
+    Returns None for a well-formed formula, otherwise the first Problem found.
+    """
+    if not formula or not formula.strip():
+        return Problem("syntax", "Empty formula")
+
+    latex = LATEX.search(formula)
+    if latex:
+        return Problem("syntax", f"LaTeX remnant {latex.group(0)!r} at position {latex.start()}")
+
+    unbalanced = check_parentheses(formula)
+    if unbalanced:
+        return Problem("syntax", unbalanced)
+
+    try:
+        node = ltlParser.parse(formula, dialect)
+    except ltlParser.ParseError as e:
+        if dialect == "nuxmv" and ARRAY_INDEX.search(formula):
+            return None
+        return Problem("syntax", str(e))
+
+    if not allow_future:
+        future = sorted(ltlParser.operators(node) & set(ltlParser.FUTURE))
+        if future:
+            return Problem("future", f"Future operator(s) {', '.join(future)} in a past-time formula")
+
+    if identifiers is not None:
+        unknown = sorted(ltlParser.identifiers(node) - set(identifiers))
+        if unknown:
+            hints = []
+            for name in unknown:
+                close = difflib.get_close_matches(name, identifiers, n=1)
+                lowered = [i for i in identifiers if i.lower() == name.lower()]
+                match = (lowered or close or [None])[0]
+                hints.append(f"{name} (did you mean {match}?)" if match else name)
+            return Problem("undeclared", f"Undeclared identifier(s): {', '.join(hints)}")
+    return None
@@ -0,0 +1,115 @@
+import array
+import json
+import mmap
+import os
+import random
+
+
+SEED = 0
+INDEX_SUFFIX = ".idx"
+
+
+def parse_example(line):
+    obj = json.loads(line)
+
+    nl = " ".join(obj["logic_sentence"])
+    ltl = " ".join(obj["logic_ltl"])
+
+    return {
+        "nl": nl.strip(),
+        "ltl": ltl.strip()
+    }
+
+
+def build_index(path, index_path):
+    """Write the byte offset of every non-blank line, followed by the file size."""
+    offsets = array.array("Q")
+    with open(path, "rb") as f:
+        pos = 0
+        for line in f:
+            if line.strip():
+                offsets.append(pos)
+            pos += len(line)
+    offsets.append(pos)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        offsets.tofile(f)
+    os.replace(tmp_path, index_path)
+    return offsets
+
+
+def load_index(path, index_path):
+    """Offsets from the sidecar, rebuilt when it is missing, older than the data or of another size."""
+    size = os.path.getsize(path)
+    if os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(path):
+        offsets = array.array("Q")
+        with open(index_path, "rb") as f:
+            offsets.frombytes(f.read())
+        if offsets and offsets[-1] == size:
+            return offsets
+    return build_index(path, index_path)
+
+
+class LiftedDataset:
+    """Random access to the lifted NL/LTL examples of a JSONL file.
+
+    Lines are located through a byte-offset sidecar (`<path>.idx`, built once)
+    and read from an mmap, so opening is instant and only the examples asked
+    for are parsed.
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.offsets = load_index(path, index_path or path + INDEX_SUFFIX)
+        self.file = open(path, "rb")
+        size = self.offsets[-1]
+        # mmap cannot map an empty file
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"Example {i} out of range for {len(self)} examples")
+        return parse_example(self.data[self.offsets[i]:self.offsets[i + 1]])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def sample(self, k, seed=SEED):
+        """k distinct examples in a seeded random order (all of them, shuffled, if k >= len)."""
+        indices = random.Random(seed).sample(range(len(self)), min(k, len(self)))
+        return [self[i] for i in indices]
+
+    def shard(self, worker, workers):
+        """Every workers-th example starting at `worker`, so workers split the file without overlap."""
+        for i in range(worker, len(self), workers):
+            yield self[i]
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+
+def reservoir_sample(path, k, seed=SEED):
+    """k examples drawn uniformly in one streaming pass, without an index (Algorithm R)."""
+    rng = random.Random(seed)
+    reservoir = []
+    seen = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if seen < k:
+                reservoir.append(line)
+            else:
+                j = rng.randrange(seen + 1)
+                if j < k:
+                    reservoir[j] = line
+            seen += 1
+    return [parse_example(line) for line in reservoir]
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+LOG_PATH = "llm_responses.log"
+# "read-through": answer from the cache, ask the LLM on a miss and store the answer
+# "record": always ask the LLM and store the answer, "replay": cache only, a miss is an error
+# "off": no caching
+MODE = os.environ.get("LLM_CACHE_MODE", "read-through")
+MODES = ("read-through", "record", "replay", "off")
+
+
+class CacheMiss(KeyError):
+    pass
+
+
+def request_key(request, sample=0):
+    """Hash of everything that determines an answer: model, messages, temperature, seed, ...
+
+    `sample` tells apart repeated draws of the same request (e.g. iterations at
+    a temperature above 0), which would otherwise all replay the first answer.
+    """
+    raw = json.dumps({"request": request, "sample": sample}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """LLM answers in an append-only log of compressed records, indexed by request hash.
+
+    The index (`<log>.sqlite`) maps a key to the offset and length of its
+    newest record; re-recorded answers are appended, never rewritten. It is
+    kept apart from the verdict cache so clearing checker state keeps the answers.
+    """
+
+    def __init__(self, path=LOG_PATH, mode=MODE):
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM cache mode {mode!r}, expected one of {', '.join(MODES)}")
+        self.path = path
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+
+        self.log = open(path, "a+b")
+        self.db = sqlite3.connect(path + ".sqlite", check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, offset INTEGER NOT NULL, length INTEGER NOT NULL, "
+            "model TEXT, created REAL NOT NULL)"
+        )
+        self.db.commit()
+
+    def lookup(self, request, sample=0):
+        """Cached answer or None (always None in record mode). Raises CacheMiss in replay mode."""
+        if self.mode in ("record", "off"):
+            return None
+        key = request_key(request, sample)
+        with self.lock:
+            row = self.db.execute("SELECT offset, length FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                if self.mode == "replay":
+                    raise CacheMiss(f"No recorded answer for request {key[:12]} (sample {sample})")
+                return None
+            self.hits += 1
+            self.log.seek(row[0])
+            record = json.loads(zlib.decompress(self.log.read(row[1])))
+        return record["content"]
+
+    def store(self, request, content, sample=0):
+        if self.mode in ("replay", "off"):
+            return
+        key = request_key(request, sample)
+        record = {"request": request, "sample": sample, "content": content}
+        data = zlib.compress(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+        with self.lock:
+            self.log.seek(0, os.SEEK_END)
+            offset = self.log.tell()
+            self.log.write(data)
+            self.log.flush()
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, offset, length, model, created) VALUES (?, ?, ?, ?, ?)",
+                (key, offset, len(data), request.get("model"), time.time())
+            )
+            self.db.commit()
+            self.stored += 1
+
+    def complete(self, request, ask, sample=0):
+        """Answer for `request`, calling `ask(request)` (returning the message text) on a miss."""
+        content = self.lookup(request, sample)
+        if content is None:
+            content = ask(request)
+            self.store(request, content, sample)
+        return content
+
+    def report(self):
+        if self.mode == "off":
+            return
+        with self.lock:
+            size = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        print(
+            f"LLM cache ({self.mode}): {self.hits} hits, {self.misses} misses, "
+            f"{self.stored} answers stored, {size} indexed"
+        )
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+            self.log.close()
@@ -0,0 +1,185 @@
+import asyncio
+import random
+import threading
+import time
+import openai
+from openai import AsyncOpenAI
+
+
+REQUESTS_PER_MINUTE = 500
+TOKENS_PER_MINUTE = 200000
+MAX_IN_FLIGHT = 16
+MAX_RETRIES = 6
+BASE_BACKOFF = 1.0  # seconds, doubled per retry with jitter
+MAX_BACKOFF = 60.0
+# Status codes worth retrying: rate limits, timeouts, conflicts and server errors
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# Tokens a request is assumed to use before its usage is known (prompt estimate is added)
+EXPECTED_COMPLETION_TOKENS = 1000
+
+
+class TokenBucket:
+    """Refills at `per_minute` units per minute up to one minute's worth.
+
+    `acquire` waits until the amount is available. Debts are allowed
+    (`adjust` with actual usage) and simply delay later requests.
+    """
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount):
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                await asyncio.sleep((amount - self.level) / self.rate)
+
+    def adjust(self, amount):
+        self._refill()
+        self.level -= amount
+
+
+def prompt_tokens(request):
+    # About four characters per token for English prompts
+    return sum(len(m["content"]) for m in request["messages"]) // 4
+
+
+def estimate_tokens(request):
+    return prompt_tokens(request) + EXPECTED_COMPLETION_TOKENS
+
+
+def retry_after(error):
+    """Seconds the server asked us to wait, if it said so."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class LLMScheduler:
+    """Runs chat completions concurrently under request and token rate limits.
+
+    An event loop on a background thread owns the async client; `submit`
+    can be called from ordinary code and returns a concurrent.futures.Future
+    with the message content, so callers can keep results in their own order.
+    The client honours OPENAI_BASE_URL, which points it at a local stub server
+    (`python llmStub.py` runs the scheduler against one that is slow and answers 429s).
+    With an llmCache.LLMCache, cached answers skip the limiter and new ones are stored.
+    """
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 max_in_flight=MAX_IN_FLIGHT, max_retries=MAX_RETRIES, client_factory=None, cache=None):
+        self.max_retries = max_retries
+        self.cache = cache
+        # Retries are ours, the client would otherwise retry behind the limiter's back
+        self.client_factory = client_factory or (lambda: AsyncOpenAI(max_retries=0))
+        # Created on the first request that misses the cache, replayed runs need no API key
+        self.client = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+        async def setup():
+            self.requests = TokenBucket(requests_per_minute)
+            self.tokens = TokenBucket(tokens_per_minute)
+            self.slots = asyncio.Semaphore(max_in_flight)
+
+        asyncio.run_coroutine_threadsafe(setup(), self.loop).result()
+        self.completed = 0
+        self.retries = 0
+        self.used_tokens = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.started = time.perf_counter()
+
+    async def _complete(self, request, sample):
+        if self.cache is not None:
+            content = self.cache.lookup(request, sample)
+            if content is not None:
+                return content
+
+        if self.client is None:
+            self.client = self.client_factory()
+        estimate = estimate_tokens(request)
+        for attempt in range(self.max_retries + 1):
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimate)
+            try:
+                async with self.slots:
+                    response = await self.client.chat.completions.create(**request)
+            except (openai.APIStatusError, openai.APIConnectionError) as e:
+                status = getattr(e, "status_code", None)
+                if (status is not None and status not in RETRY_STATUS) or attempt == self.max_retries:
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt) * random.uniform(0.5, 1.0)
+                print(f"⏳ LLM request failed ({status or type(e).__name__}), retrying in {delay:.1f} s")
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            if response.usage is not None:
+                self.tokens.adjust(response.usage.total_tokens - estimate)
+                self.used_tokens += response.usage.total_tokens
+                self.prompt_tokens += response.usage.prompt_tokens
+                details = getattr(response.usage, "prompt_tokens_details", None)
+                self.cached_tokens += getattr(details, "cached_tokens", None) or 0
+            self.completed += 1
+            content = response.choices[0].message.content.strip()
+            if self.cache is not None:
+                self.cache.store(request, content, sample)
+            return content
+
+    def submit(self, request, sample=0):
+        """Queue one chat completion (the keyword arguments of chat.completions.create).
+
+        `sample` numbers repeated draws of the same request for the cache.
+        """
+        return asyncio.run_coroutine_threadsafe(self._complete(request, sample), self.loop)
+
+    def map(self, requests):
+        """Message contents for `requests`, in their order."""
+        futures = [self.submit(request) for request in requests]
+        return [future.result() for future in futures]
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        print(
+            f"LLM scheduler: {self.completed} completions in {elapsed:.1f} s, "
+            f"{self.retries} retries, {self.used_tokens} tokens "
+            f"({self.prompt_tokens} prompt, {self.cached_tokens} of them served from the provider's prompt cache)"
+        )
+
+    def close(self):
+        async def shutdown():
+            if self.client is not None:
+                await self.client.close()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
@@ -0,0 +1,94 @@
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai import AsyncOpenAI
+
+import llmScheduler
+
+
+# Stand-in for the chat completions endpoint, to exercise llmScheduler without an API key
+LATENCY = (0.2, 1.0)  # seconds, each answer is delayed by a uniform draw from this range
+RATE_LIMITED = 0.2  # share of requests answered with 429
+RETRY_AFTER_MS = 500  # sent with every 429, as the real API does
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    served = 0
+    limited = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+        time.sleep(random.uniform(*LATENCY))
+        if random.random() < RATE_LIMITED:
+            with StubHandler.lock:
+                StubHandler.limited += 1
+            self._reply(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                        {"retry-after-ms": str(RETRY_AFTER_MS)})
+            return
+        prompt = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+        with StubHandler.lock:
+            StubHandler.served += 1
+        self._reply(200, {
+            "id": f"stub-{StubHandler.served}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "G (stub)"}}],
+            "usage": {"prompt_tokens": prompt, "completion_tokens": 3, "total_tokens": prompt + 3},
+        })
+
+    def _reply(self, status, payload, headers=()):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in dict(headers).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start(port=0):
+    """Serve the stub on localhost in a background thread, returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    # Usage: python llmStub.py [requests] [requests_per_minute]
+    # Runs the scheduler against the stub and checks the rate limit and the 429 retries
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    rpm = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    server, base_url = start()
+    print(f"🧪 Stub server at {base_url}: latency {LATENCY[0]}-{LATENCY[1]} s, {RATE_LIMITED:.0%} answered with 429")
+    scheduler = llmScheduler.LLMScheduler(
+        requests_per_minute=rpm,
+        client_factory=lambda: AsyncOpenAI(base_url=base_url, api_key="stub", max_retries=0),
+    )
+    # Start from an empty bucket so the limit shows from the first request
+    scheduler.loop.call_soon_threadsafe(setattr, scheduler.requests, "level", 0.0)
+    requests = [{"model": "stub", "messages": [{"role": "user", "content": f"Requirement {i}"}]}
+                for i in range(count)]
+    start_time = time.perf_counter()
+    answers = scheduler.map(requests)
+    elapsed = time.perf_counter() - start_time
+    scheduler.report()
+    scheduler.close()
+    server.shutdown()
+
+    floor = (count - 1) * 60 / rpm
+    print(f"Stub: {StubHandler.served} answered, {StubHandler.limited} rate limited")
+    ok = len(answers) == count and scheduler.retries == StubHandler.limited and elapsed >= floor
+    print(f"{'✅' if ok else '❌'} {count} requests in {elapsed:.1f} s (limit allows no less than {floor:.1f} s), "
+          f"{scheduler.retries} retries for {StubHandler.limited} 429s")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,677 @@
+import re
+import functools
+
+
+UNARY = ("!", "H", "O", "Y", "Z", "G", "F", "X")
+TEMPORAL_BINARY = ("S", "U")
+COMPARISONS = ("=", "!=", "<", "<=", ">", ">=")
+BOUNDABLE = ("H", "O", "G", "F", "S", "U")
+PAST = ("H", "O", "Y", "Z", "S")
+FUTURE = ("G", "F", "X", "U")
+# Spot has no past operators, there H, O, Y, Z and S are plain atomic propositions
+SPOT_UNARY = ("!", "G", "F", "X")
+SPOT_BINARY = ("U", "W", "R", "M")
+# Alternative operator spellings Spot accepts
+SPOT_SPELLINGS = {"&&": "&", "||": "|", "=>": "->", "<=>": "<->", "~": "!", "[]": "G", "<>": "F", "^": "xor"}
+
+TOKEN = re.compile(
+    r"\s*(?:"
+    r"(?P<num>\d+(?:\.\d+)?)"
+    r"|(?P<ident>[A-Za-z_][A-Za-z0-9_$#.]*)"
+    r"|(?P<op><->|<=>|->|=>|<>|<=|>=|!=|&&|\|\||\[\]|\.\.|[!~^&|()=<>+\-*/\[\],:])"
+    r")"
+)
+
+
+class ParseError(ValueError):
+    def __init__(self, message, formula, pos):
+        super().__init__(f"{message} at position {pos}: {formula[:pos]}⟨here⟩{formula[pos:]}")
+        self.formula = formula
+        self.pos = pos
+
+
+class Node:
+    """Hash-consed formula node: structurally equal formulas are the same object."""
+
+    __slots__ = ("op", "args", "value", "_text")
+    _table = {}
+
+    def __new__(cls, op, args=(), value=None):
+        key = (op, args, value)
+        node = cls._table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.op = op
+            node.args = args
+            node.value = value
+            node._text = None
+            # setdefault keeps interning consistent when worker threads race
+            node = cls._table.setdefault(key, node)
+        return node
+
+    def __repr__(self):
+        return f"Node({to_string(self)})"
+
+
+TRUE = Node("const", value=True)
+FALSE = Node("const", value=False)
+
+
+def var(name):
+    return Node("var", value=name)
+
+
+def num(value):
+    return Node("num", value=value)
+
+
+def mk(op, *args):
+    return Node(op, tuple(args))
+
+
+# ---------------------------------------------------------------- parsing
+
+def tokenize(formula):
+    tokens = []
+    pos = 0
+    formula = formula.rstrip()
+    while pos < len(formula):
+        m = TOKEN.match(formula, pos)
+        if m is None or m.end() == pos:
+            raise ParseError(f"Unexpected character {formula[pos].strip() or 'space'!r}", formula, pos)
+        kind = m.lastgroup
+        tokens.append((kind, m.group(kind), m.start(kind)))
+        pos = m.end()
+    tokens.append(("end", None, len(formula)))
+    return tokens
+
+
+class Parser:
+    """Recursive-descent parser for the nuXmv / Spot LTL subset we generate.
+
+    Precedence, loosest first: ->, <->, | xor xnor, &, S U, unary (! H O Y Z G F X),
+    comparisons, + -, * / mod. H, O, G, F, S and U take an optional bound
+    `[n,m]` (stored as the node value). `dialect="spot"` follows Spot instead:
+    -> and <-> share one right-associative level, then |, xor, &, the
+    right-associative U W R M, unary operators; past operators are atoms,
+    true/false/1/0 are constants, Spot's other spellings (&&, ||, =>, <=>, ~,
+    [], <>, ^) are accepted, X[n] is n nested X and W, R, M are rewritten
+    with U.
+    """
+
+    def __init__(self, formula, dialect="nuxmv"):
+        self.formula = formula
+        self.dialect = dialect
+        self.tokens = tokenize(formula)
+        if dialect == "spot":
+            self.tokens = [
+                (kind, SPOT_SPELLINGS.get(value, value) if kind == "op" else value, pos)
+                for kind, value, pos in self.tokens
+            ]
+        self.i = 0
+        self.unary_ops = SPOT_UNARY if dialect == "spot" else UNARY
+        self.binary_ops = SPOT_BINARY if dialect == "spot" else TEMPORAL_BINARY
+
+    def peek(self):
+        return self.tokens[self.i]
+
+    def take(self):
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def accept(self, *values):
+        kind, value, _ = self.peek()
+        if kind in ("op", "ident") and value in values:
+            self.i += 1
+            return value
+        return None
+
+    def expect(self, value):
+        if self.accept(value) is None:
+            _, got, pos = self.peek()
+            raise ParseError(f"Expected {value!r} but found {got or 'end of formula'!r}", self.formula, pos)
+
+    def parse(self):
+        node = self.implication()
+        kind, value, pos = self.peek()
+        if kind != "end":
+            raise ParseError(f"Unexpected {value!r}", self.formula, pos)
+        return node
+
+    def implication(self):
+        if self.dialect == "spot":
+            return self.spot_implication()
+        left = self.iff()
+        if self.accept("->"):
+            return mk("->", left, self.implication())
+        return left
+
+    def iff(self):
+        node = self.disjunction()
+        while self.accept("<->"):
+            node = mk("<->", node, self.disjunction())
+        return node
+
+    def disjunction(self):
+        node = self.conjunction()
+        while True:
+            op = self.accept("|", "xor", "xnor")
+            if op is None:
+                return node
+            right = self.conjunction()
+            node = mk("!", mk("xor", node, right)) if op == "xnor" else mk(op, node, right)
+
+    def spot_implication(self):
+        left = self.spot_disjunction()
+        op = self.accept("->", "<->")
+        if op is None:
+            return left
+        return mk(op, left, self.spot_implication())
+
+    def spot_disjunction(self):
+        node = self.spot_xor()
+        while self.accept("|"):
+            node = mk("|", node, self.spot_xor())
+        return node
+
+    def spot_xor(self):
+        node = self.conjunction()
+        while self.accept("xor"):
+            node = mk("xor", node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.temporal()
+        while self.accept("&"):
+            node = mk("&", node, self.temporal())
+        return node
+
+    def bound(self):
+        if self.accept("[") is None:
+            return None
+        lo = self.integer()
+        if self.accept(",", ":", "..") is None:
+            _, got, pos = self.peek()
+            raise ParseError(f"Expected ',' in bound but found {got!r}", self.formula, pos)
+        hi = self.integer()
+        self.expect("]")
+        return (lo, hi)
+
+    def integer(self):
+        kind, value, pos = self.take()
+        if kind != "num" or not value.isdigit():
+            raise ParseError(f"Expected an integer bound but found {value!r}", self.formula, pos)
+        return int(value)
+
+    def temporal(self):
+        node = self.unary()
+        op = self.accept(*self.binary_ops)
+        if op is None:
+            return node
+        if self.dialect == "spot":
+            bound = self.bound() if op == "U" else None
+            right = self.temporal()
+            if op == "W":
+                return mk("|", mk("U", node, right), mk("G", node))
+            if op == "R":
+                return mk("!", mk("U", negate(node), negate(right)))
+            if op == "M":
+                return mk("U", right, mk("&", node, right))
+            return Node(op, (node, right), bound)
+        while op is not None:
+            bound = self.bound()
+            node = Node(op, (node, self.unary()), bound)
+            op = self.accept(*self.binary_ops)
+        return node
+
+    def unary(self):
+        op = self.accept(*self.unary_ops)
+        if op is not None:
+            if op == "X" and self.dialect == "spot" and self.accept("["):
+                _, _, pos = self.peek()
+                steps = self.integer()
+                if steps > MAX_EXPANDED_BOUND:
+                    raise ParseError(f"X[{steps}] nests more than {MAX_EXPANDED_BOUND} X", self.formula, pos)
+                self.expect("]")
+                return next_n(self.unary(), steps)
+            bound = self.bound() if op in BOUNDABLE else None
+            return Node(op, (self.unary(),), bound)
+        return self.comparison()
+
+    def comparison(self):
+        left = self.arith()
+        op = self.accept(*COMPARISONS)
+        if op is not None:
+            return mk(op, left, self.arith())
+        return left
+
+    def arith(self):
+        node = self.term()
+        while True:
+            op = self.accept("+", "-")
+            if op is None:
+                return node
+            node = mk(op, node, self.term())
+
+    def term(self):
+        node = self.factor()
+        while True:
+            op = self.accept("*", "/", "mod")
+            if op is None:
+                return node
+            node = mk(op, node, self.factor())
+
+    def factor(self):
+        kind, value, pos = self.take()
+        if kind == "op" and value == "(":
+            node = self.implication()
+            self.expect(")")
+            return node
+        if kind == "op" and value == "-":
+            operand = self.factor()
+            if operand.op == "num":
+                return num(-operand.value)
+            return mk("neg", operand)
+        if kind == "num":
+            if self.dialect == "spot" and value in ("0", "1"):
+                return TRUE if value == "1" else FALSE
+            return num(float(value) if "." in value else int(value))
+        if kind == "ident":
+            if value in ("TRUE", "FALSE") or (self.dialect == "spot" and value in ("true", "false")):
+                return TRUE if value.upper() == "TRUE" else FALSE
+            if value in self.unary_ops + self.binary_ops or value in ("xor", "xnor", "mod"):
+                raise ParseError(f"Operator {value!r} is missing an operand", self.formula, pos)
+            return var(value)
+        raise ParseError(f"Unexpected {value or 'end of formula'!r}", self.formula, pos)
+
+
+def parse(formula, dialect="nuxmv"):
+    return Parser(formula, dialect).parse()
+
+
+# ---------------------------------------------------------------- printing
+
+def to_string(node, dialect="nuxmv"):
+    """Fully parenthesized text accepted by nuXmv (or Spot with `dialect="spot"`)."""
+    if dialect == "nuxmv" and node._text is not None:
+        return node._text
+
+    op = node.op
+    if op == "const":
+        if dialect == "spot":
+            return "true" if node.value else "false"
+        text = "TRUE" if node.value else "FALSE"
+    elif op in ("var", "num"):
+        text = str(node.value)
+    elif op == "neg":
+        text = f"(- {to_string(node.args[0], dialect)})"
+    elif op in BOUNDABLE and node.value is not None:
+        lo, hi = node.value
+        bounded = f"{op}[{lo},{hi}]" if dialect == "nuxmv" else f"{op}[{lo}:{hi}]"
+        if len(node.args) == 1:
+            text = f"({bounded} {to_string(node.args[0], dialect)})"
+        else:
+            text = f"({to_string(node.args[0], dialect)} {bounded} {to_string(node.args[1], dialect)})"
+    elif op in UNARY:
+        text = f"({op} {to_string(node.args[0], dialect)})"
+    else:
+        text = "(" + f" {op} ".join(to_string(a, dialect) for a in node.args) + ")"
+
+    if dialect == "nuxmv":
+        node._text = text
+    return text
+
+
+@functools.lru_cache(maxsize=None)
+def size(node):
+    return 1 + sum(size(a) for a in node.args)
+
+
+def identifiers(node):
+    if node.op == "var":
+        return {node.value}
+    names = set()
+    for a in node.args:
+        names |= identifiers(a)
+    return names
+
+
+def operators(node):
+    ops = {node.op} if node.args else set()
+    for a in node.args:
+        ops |= operators(a)
+    return ops
+
+
+# ---------------------------------------------------------------- simplification
+
+ABSORBING = {"&": FALSE, "|": TRUE}
+NEUTRAL = {"&": TRUE, "|": FALSE}
+# Operators that distribute over & or | and can therefore be merged: H a & H b == H (a & b)
+MERGEABLE = {"&": ("H", "G", "Y", "Z", "X"), "|": ("O", "F", "Y", "Z", "X")}
+CONST_FOLD = {
+    ("H", True): TRUE, ("H", False): FALSE,
+    ("O", True): TRUE, ("O", False): FALSE,
+    ("G", True): TRUE, ("G", False): FALSE,
+    ("F", True): TRUE, ("F", False): FALSE,
+    ("X", True): TRUE, ("X", False): FALSE,
+    ("Y", False): FALSE, ("Z", True): TRUE,
+}
+IDEMPOTENT = ("H", "O", "G", "F")
+ARITH = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+}
+COMPARE = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def negate(node):
+    if node.op == "!":
+        return node.args[0]
+    if node.op == "const":
+        return FALSE if node.value else TRUE
+    return mk("!", node)
+
+
+def nary(op, operands, sort=False):
+    """Flatten, fold constants, drop duplicates, merge distributable operators."""
+    flat = []
+    for a in operands:
+        flat.extend(a.args if a.op == op else (a,))
+
+    seen = set()
+    kept = []
+    for a in flat:
+        if a is ABSORBING[op]:
+            return ABSORBING[op]
+        if a is NEUTRAL[op] or a in seen:
+            continue
+        seen.add(a)
+        kept.append(a)
+
+    if any(negate(a) in seen for a in kept):
+        return ABSORBING[op]
+
+    groups = {}
+    for a in kept:
+        if a.op in MERGEABLE[op]:
+            groups.setdefault((a.op, a.value), []).append(a)
+    for (temporal, bound), group in groups.items():
+        if len(group) > 1:
+            kept = [a for a in kept if a not in group]
+            inner = nary(op, [a.args[0] for a in group], sort)
+            if bound is None:
+                kept.append(simplify_node(temporal, (inner,), sort))
+            else:
+                kept.append(Node(temporal, (inner,), bound))
+
+    if sort:
+        kept.sort(key=to_string)
+    if not kept:
+        return NEUTRAL[op]
+    if len(kept) == 1:
+        return kept[0]
+    return Node(op, tuple(kept))
+
+
+def simplify_node(op, args, sort, bound=None):
+    if bound is not None:
+        # Bounded operators are kept as they are, only their operands are simplified
+        return Node(op, tuple(args), bound)
+
+    if op == "!":
+        return negate(args[0])
+
+    if op in ("&", "|"):
+        return nary(op, args, sort)
+
+    if op in CONST_FOLD or op in ("Y", "Z"):
+        a = args[0]
+        if a.op == "const" and (op, a.value) in CONST_FOLD:
+            return CONST_FOLD[(op, a.value)]
+        if op in IDEMPOTENT and a.op == op:
+            return a
+        return mk(op, a)
+
+    if op == "->":
+        a, b = args
+        if a is TRUE or b is FALSE:
+            return simplify_node("!", (a,), sort) if b is FALSE else b
+        if a is FALSE or b is TRUE or a is b:
+            return TRUE
+        # Curry nested implications: a -> (b -> c) == (a & b) -> c
+        if b.op == "->":
+            return simplify_node("->", (nary("&", (a, b.args[0]), sort), b.args[1]), sort)
+        return mk("->", a, b)
+
+    if op in ("<->", "xor"):
+        a, b = args
+        if sort and to_string(b) < to_string(a):
+            a, b = b, a
+        if a.op == "const" or b.op == "const":
+            const, other = (a, b) if a.op == "const" else (b, a)
+            return other if const.value == (op == "<->") else negate(other)
+        if a is b:
+            return TRUE if op == "<->" else FALSE
+        return mk(op, a, b)
+
+    if op in ("S", "U"):
+        a, b = args
+        if b.op == "const":
+            return b
+        if a is FALSE:
+            return b
+        if a is TRUE:
+            return simplify_node("O" if op == "S" else "F", (b,), sort)
+        return mk(op, a, b)
+
+    if op in COMPARISONS:
+        a, b = args
+        if a.op == "num" and b.op == "num":
+            return TRUE if COMPARE[op](a.value, b.value) else FALSE
+        if a is b:
+            return TRUE if op in ("=", "<=", ">=") else FALSE
+        return mk(op, a, b)
+
+    if op in ARITH and all(a.op == "num" for a in args):
+        return num(ARITH[op](args[0].value, args[1].value))
+
+    return Node(op, tuple(args))
+
+
+def _rewrite(node, memo, sort):
+    result = memo.get(node)
+    if result is None:
+        if node.args:
+            args = tuple(_rewrite(a, memo, sort) for a in node.args)
+            result = simplify_node(node.op, args, sort, node.value)
+        else:
+            result = node
+        memo[node] = result
+    return result
+
+
+def simplify(node):
+    """Semantics-preserving shrinking: flattening, constant folding, double negation, currying."""
+    return _rewrite(node, {}, sort=False)
+
+
+# ---------------------------------------------------------------- canonical form
+
+DUAL = {"H": "O", "O": "H", "G": "F", "F": "G", "Y": "Z", "Z": "Y", "X": "X"}
+FLIPPED = {">": "<", ">=": "<="}
+
+
+def _normal(node, negated, memo):
+    """Negation normal form over the boolean and unary temporal operators.
+
+    `->`, `<->`, `!=`, `>` and `>=` are expressed through !, |, xor, = and <,
+    so syntactically different but trivially equal formulas meet.
+    """
+    key = (node, negated)
+    if key in memo:
+        return memo[key]
+
+    op, args = node.op, node.args
+    if op == "!":
+        result = _normal(args[0], not negated, memo)
+    elif op == "->":
+        result = _normal(mk("|", mk("!", args[0]), args[1]), negated, memo)
+    elif op == "<->":
+        result = _normal(mk("xor", *args), not negated, memo)
+    elif op in ("&", "|"):
+        new_op = {"&": "|", "|": "&"}[op] if negated else op
+        result = nary(new_op, [_normal(a, negated, memo) for a in args], sort=True)
+    elif op == "xor":
+        # Pull negations out of parity: !a xor b == !(a xor b)
+        parity = negated
+        operands = []
+        for a in args:
+            a = _normal(a, False, memo)
+            flat = a.args if a.op == "xor" else (a,)
+            for b in flat:
+                if b.op == "!":
+                    parity = not parity
+                    b = b.args[0]
+                if b.op == "const":
+                    parity ^= b.value
+                    continue
+                if b in operands:
+                    operands.remove(b)
+                else:
+                    operands.append(b)
+        operands.sort(key=to_string)
+        if not operands:
+            result = TRUE if parity else FALSE
+        else:
+            core = operands[0] if len(operands) == 1 else Node("xor", tuple(operands))
+            result = negate(core) if parity else core
+    elif op in DUAL:
+        inner_op = DUAL[op] if negated else op
+        result = simplify_node(inner_op, (_normal(args[0], negated, memo),), True, node.value)
+    elif op in COMPARISONS:
+        a, b = (_normal(x, False, memo) for x in args)
+        if op in FLIPPED:
+            op, a, b = FLIPPED[op], b, a
+        if op == "!=":
+            op, negated = "=", not negated
+        elif op == "<=":
+            # a <= b == !(b < a)
+            op, a, b, negated = "<", b, a, not negated
+        if op == "=" and to_string(b) < to_string(a):
+            a, b = b, a
+        atom = simplify_node(op, (a, b), sort=True)
+        result = negate(atom) if negated else atom
+    elif op == "const":
+        result = negate(node) if negated else node
+    else:
+        if args:
+            atom = simplify_node(op, tuple(_normal(a, False, memo) for a in args), True, node.value)
+        else:
+            atom = node
+        result = negate(atom) if negated else atom
+
+    memo[key] = result
+    return result
+
+
+def canonical(node):
+    """Canonical form used to decide equivalence syntactically (sound, not complete)."""
+    return _normal(_rewrite(node, {}, sort=True), False, {})
+
+
+def prepare_pair(f1, f2, dialect="nuxmv"):
+    """Parse, canonicalize and simplify a formula pair before it reaches a checker.
+
+    Returns (verdict, (s1, s2), (k1, k2)): verdict is True when both canonical
+    forms coincide and None otherwise, s1/s2 are the simplified formulas to
+    check and k1/k2 the canonical texts, usable as cache keys. Formulas that
+    do not parse are passed through unchanged for the checker to report.
+    """
+    try:
+        n1 = parse(f1, dialect)
+        n2 = parse(f2, dialect)
+    except ParseError:
+        return None, (f1, f2), (f1, f2)
+
+    c1 = canonical(n1)
+    c2 = canonical(n2)
+    simplified = (to_string(simplify(n1), dialect), to_string(simplify(n2), dialect))
+    keys = (to_string(c1, dialect), to_string(c2, dialect))
+    return (True if c1 is c2 else None), simplified, keys
+
+
+# ---------------------------------------------------------------- bounded operators
+
+# Largest upper bound expanded into nested X, deeper nestings exceed Python's recursion limit
+MAX_EXPANDED_BOUND = 100
+# Largest expansion (nodes of the printed formula), nested bounds multiply its size
+MAX_EXPANDED_SIZE = 5000
+
+
+class BoundTooLarge(ValueError):
+    pass
+
+
+def next_n(node, n):
+    for _ in range(n):
+        node = mk("X", node)
+    return node
+
+
+def expand_bounds(node):
+    """Equivalent formula with bounded G, F and U rewritten into nested X.
+
+    F[lo,hi] f == X^lo (f | X (f | ... X f)) with hi-lo nested X, G dually, and
+    a U[lo,hi] b == (a & X (a & ... X (b | (a & X (b | ... X b))))) with lo
+    leading steps of a. Nodes are hash-consed, so every distinct subformula is
+    expanded once per process. Past-time bounds are left as they are.
+    Raises BoundTooLarge when a bound exceeds MAX_EXPANDED_BOUND or the
+    expansion MAX_EXPANDED_SIZE nodes.
+    """
+    expanded = _expand(node)
+    if size(expanded) > MAX_EXPANDED_SIZE:
+        raise BoundTooLarge(f"Expansion of {to_string(node, 'spot')} exceeds {MAX_EXPANDED_SIZE} nodes")
+    return expanded
+
+
+@functools.lru_cache(maxsize=None)
+def _expand(node):
+    args = tuple(_expand(a) for a in node.args)
+    if node.op not in ("G", "F", "U") or node.value is None:
+        return Node(node.op, args, node.value)
+    if any(size(a) > MAX_EXPANDED_SIZE for a in args):
+        # Nested bounds already too large, stop before multiplying them
+        raise BoundTooLarge(f"Expansion of nested bounds exceeds {MAX_EXPANDED_SIZE} nodes")
+
+    lo, hi = node.value
+    if hi > MAX_EXPANDED_BOUND:
+        raise BoundTooLarge(f"Bound [{lo},{hi}] of {node.op} exceeds {MAX_EXPANDED_BOUND}")
+    if hi < lo:
+        # Empty window: nothing can be reached, everything holds
+        return TRUE if node.op == "G" else FALSE
+
+    if node.op == "U":
+        a, b = args
+        window = b
+        for _ in range(hi - lo):
+            window = mk("|", b, mk("&", a, mk("X", window)))
+        for _ in range(lo):
+            window = mk("&", a, mk("X", window))
+        return window
+
+    f = args[0]
+    join = "&" if node.op == "G" else "|"
+    window = f
+    for _ in range(hi - lo):
+        window = mk(join, f, mk("X", window))
+    return next_n(window, lo)
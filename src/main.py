@@ -1,48 +1,65 @@
+import sys
+import json
+import functools
 from openai import OpenAI
 import csvHandler
 import nuXmvHandler
+import equivalenceExecutor
+import systemRegistry
+import checkMetrics
+import llmScheduler
+import llmCache
+import batchProtocol
+import variableRetrieval
+import batchJobs
 
 MODEL = "gpt-5-chat-latest"  # You can also try: "gpt-5" "gpt-5-chat-latest" "gpt-4-turbo" "gpt-5-reasoning"
 SPEC = "UV_nuXmvTest"
 NUM_ITERATIONS = 1 # Number of iterations for the entire batch process
 TEMPERATURE = 0  # Adjust temperature for variability in responses
-EQUIVALENCE_HANDLER = nuXmvHandler.check_equivalence_master
-
-
-### Load CSV data and variable table
-#VARIABLETABLE = csvHandler.get_master_variable_table_info()
-#CSVDATA = csvHandler.load_and_validate_csv("masterFiles/masterUseCaseReq.csv")
-
-#VARIABLETABLE = csvHandler.get_lung_ventilator_variable_table_info()
-#CSVDATA = csvHandler.load_and_validate_csv("lungFiles/lungVentilatorReq.csv")
+SYSTEM = "master"  # One of the systems in systemModels.json: "master", "rover", "abzrover", "drone", "pipeline", "lungV"
+NUM_WORKERS = equivalenceExecutor.NUM_WORKERS  # Parallel equivalence checks, defaults to the core count (env EQUIV_WORKERS)
+JOB_TIMEOUT = 600  # seconds a chunk's equivalence checks may take before they count as no verdict
+ASYNC_GENERATION = True  # send all chunk requests at once through llmScheduler (rate limited, with retries)
+CHUNK_SIZE = 5  # ✅ safe default; 3–10 works well. Adapted during the run by batchProtocol.ChunkSizer
+MAX_REPAIR_ROUNDS = 2  # re-requests for requirement IDs missing from a batch answer
+MAX_COMPLETION_TOKENS = 16384
+RETRIEVE_VARIABLES = False  # prompt each chunk with only the variables relevant to its requirements (BM25); misses variables the wording does not name (drone recall 0.73), so off by default
+COLLECT_METRICS = True  # per-check timing, sizes and nuXmv statistics in results/*_metrics*.jsonl
+
+
+### Load CSV data and variable table for SYSTEM from the system registry (systemModels.json)
+VARIABLETABLE = systemRegistry.variable_table(SYSTEM)
+VARIABLE_INDEX = variableRetrieval.VariableIndex(SYSTEM)
+CSVDATA = csvHandler.load_and_validate_csv(systemRegistry.requirements_path(SYSTEM))
+###
 
-#VARIABLETABLE = csvHandler.get_rover_variable_table_info()
-#CSVDATA = csvHandler.load_and_validate_csv("roverFiles/roverReq.csv")
 
-#VARIABLETABLE = csvHandler.get_abzrover_variable_table_info()
-#CSVDATA = csvHandler.load_and_validate_csv("abzRoverFiles/abzRoverReq.csv")
+@functools.lru_cache(maxsize=None)
+def openai_client():
+    # Created on the first request that goes to the network, replay and batch-ingest runs need no API key
+    return OpenAI()
 
-VARIABLETABLE = csvHandler.get_master_variable_table_info()
-CSVDATA = csvHandler.load_and_validate_csv("masterFiles/masterUseCaseReq.csv")
-###
 
+# Record/replay of LLM answers, mode from LLM_CACHE_MODE: read-through (default), record, replay, off
+LLM_CACHE = llmCache.LLMCache()
 
-client = OpenAI()
 
+def generation_request(nl_descriptions, req_ids):
 
-def askgpt_generate_LTL_batch(nl_descriptions):
-    
+    # Static instructions first, so the provider can cache the common prefix of all chunk prompts
+    table = VARIABLE_INDEX.table(nl_descriptions) if RETRIEVE_VARIABLES else VARIABLETABLE
     combined_prompt = (
         "Translate each of the following natural-language requirements "
         "into its corresponding past-time LTL (ptLTL) formula.\n\n"
-        "Return only the formulas, one per line, in the same order.\n"
-        "Do not include any numbering, explanations, or LaTeX syntax.\n\n"
+        "Each requirement is given as 'ID: description'. Return only a JSON object "
+        "mapping every requirement ID to its formula, e.g. {\"REQ1\": \"H (a -> b)\"}.\n"
+        "Do not include any explanations or LaTeX syntax.\n\n"
         "Strictly use variables from the following variable mapping:\n"
-        f"Variable mapping:\n{VARIABLETABLE}\n\n"
+        f"Variable mapping:\n{table}\n\n"
     )
 
-    for i, desc in enumerate(nl_descriptions, 1):
-        combined_prompt += f"{i}. {desc}\n"
+    combined_prompt += batchProtocol.format_requirements(req_ids, nl_descriptions)
 
     messages = [
         {"role": "system", "content": ("You are an expert in formal methods and temporal logic. "
@@ -57,27 +74,133 @@ def askgpt_generate_LTL_batch(nl_descriptions):
         {"role": "user", "content": combined_prompt}
     ]
 
-    response = client.chat.completions.create(
+    return dict(
         model=MODEL,
         messages=messages,
-        max_completion_tokens=16384,
-        temperature=TEMPERATURE # maybe change later
+        max_completion_tokens=MAX_COMPLETION_TOKENS,
+        temperature=TEMPERATURE, # maybe change later
+        response_format={"type": "json_object"}
     )
 
-    msg = response.choices[0].message.content.strip()
+
+def askgpt_generate_LTL_batch(nl_descriptions, req_ids, sample=0):
+
+    def ask(request):
+        response = openai_client().chat.completions.create(**request)
+        return response.choices[0].message.content.strip()
+
+    msg = LLM_CACHE.complete(generation_request(nl_descriptions, req_ids), ask, sample)
     # print(f"LTL Batch Result: {msg}")
     return msg
 
 
 
-def chunk_list(lst, chunk_size):
-    
-    for i in range(0, len(lst), chunk_size):
-        yield lst[i:i + chunk_size], i
-
+def chunk_list(lst, sizer):
+    """Chunks of `sizer.size` items (read at every step, so it may change between chunks)."""
+    i = 0
+    while i < len(lst):
+        chunk = lst[i:i + sizer.size]
+        yield chunk, i
+        i += len(chunk)
+
+
+def salvage_formulas(batch_output, nl_descriptions, req_ids, sample, sizer, scheduler=None, rounds=MAX_REPAIR_ROUNDS):
+    """Formulas by requirement ID from a batch answer, re-asking only for the IDs it lacks."""
+    found = batchProtocol.parse_batch(batch_output, req_ids)
+    sizer.record(len(req_ids), len(req_ids) - len(found), len(batch_output) // 4)
+
+    for _ in range(rounds):
+        missing = [i for i, req_id in enumerate(req_ids) if req_id not in found]
+        if not missing:
+            break
+        print(f"Warning: no formula for {', '.join(req_ids[i] for i in missing)}, asking again")
+        descs = [nl_descriptions[i] for i in missing]
+        missing_ids = [req_ids[i] for i in missing]
+        if scheduler is not None:
+            output = scheduler.submit(generation_request(descs, missing_ids), sample).result()
+        else:
+            output = askgpt_generate_LTL_batch(descs, missing_ids, sample)
+        repaired = batchProtocol.parse_batch(output, missing_ids)
+        sizer.record(len(missing_ids), len(missing_ids) - len(repaired), len(output) // 4)
+        found.update(repaired)
+
+    return found
+
+
+
+def batch_entries(nl_descriptions, ids):
+    """(custom_id, request, iteration, base_idx, size) of every chunk request of the run (fixed CHUNK_SIZE chunks)."""
+    sizer = batchProtocol.ChunkSizer(CHUNK_SIZE, MAX_COMPLETION_TOKENS)
+    for iteration in range(NUM_ITERATIONS):
+        for chunk, base_idx in chunk_list(nl_descriptions, sizer):
+            request = generation_request(chunk, ids[base_idx:base_idx + len(chunk)])
+            cid = batchJobs.custom_id(SPEC, SYSTEM, iteration, base_idx, len(chunk), request)
+            yield cid, request, iteration, base_idx, len(chunk)
+
+
+def write_batch_requests(path, nl_descriptions, ids):
+    """All chunk requests of all iterations as a batch-API input file."""
+    entries = ((cid, request) for cid, request, *_ in batch_entries(nl_descriptions, ids))
+    count = batchJobs.write_requests(path, entries)
+    print(f"✅ {count} batch requests for {NUM_ITERATIONS} iterations saved to {path}")
+
+
+def fabricate_batch_results(requests_path, output_path, ids, ltl_references):
+    """Batch output file answering every request with the reference formulas of its rows.
+
+    Ingesting it should find every checked requirement equivalent; edit or
+    delete lines of it to try out failed and missing requests.
+    """
+    def answer(cid, body):
+        _, _, _, base_idx, size, _ = batchJobs.parse_custom_id(cid)
+        return json.dumps({
+            req_id: reference for req_id, reference in zip(ids[base_idx:base_idx + size], ltl_references[base_idx:base_idx + size])
+            if reference
+        })
+
+    count = batchJobs.fabricate_results(requests_path, output_path, answer)
+    print(f"✅ {count} fabricated batch answers saved to {output_path}")
+
+
+def load_batch_results(path, nl_descriptions, ids):
+    """Chunk answers of a batch-API output file: {iteration: {base_idx: (size, text, error)}}.
+
+    `text` is None, and `error` says why, for a failed request and for a
+    request of the run that is missing from the file, so every row is accounted for.
+    Answers are also stored in the LLM cache under their original request,
+    so the same run can later be replayed with LLM_CACHE_MODE=replay.
+    """
+    expected = {cid: entry for cid, *entry in batch_entries(nl_descriptions, ids)}
+    answers = {}
+    failed = 0
+    for cid, content, error in batchJobs.read_results(path):
+        if cid not in expected:
+            # Another spec or system, a changed prompt or chunk size, or a repeated line
+            print(f"⚠️ Skipping {cid}: not a pending request of {SPEC} on {SYSTEM}")
+            continue
+        request, iteration, base_idx, size = expected.pop(cid)
+        if content is None:
+            print(f"⚠️ Batch request {cid} failed: {error}")
+            error = f"batch request failed: {error}"
+            failed += 1
+        else:
+            LLM_CACHE.store(request, content, iteration)
+        answers.setdefault(iteration, {})[base_idx] = (size, content, error)
+
+    print(f"Loaded {sum(len(a) for a in answers.values())} batch answers from {path}, {failed} failed")
+    if expected:
+        print(f"⚠️ {len(expected)} requests missing from {path}: {', '.join(expected)}")
+    for request, iteration, base_idx, size in expected.values():
+        answers.setdefault(iteration, {})[base_idx] = (size, None, "missing from the batch output file")
+    return answers
 
 
 # Main execution
+# Usage: python main.py                        generate through the API and check
+#        python main.py batch-write [path]     write every chunk request as a batch-API input file
+#        python main.py batch-ingest <path>    check the answers of a batch-API output file
+#        python main.py batch-fabricate <requests> <output>
+#                                              answer a batch-API input file with the reference formulas
 if __name__ == "__main__":
 
     csvData = CSVDATA
@@ -91,30 +214,89 @@ if __name__ == "__main__":
     ltl_references = [entry["LTL"] for entry in csvData]
     success_counts = {id_: 0 for id_ in ids}
 
-    # Iteration Loop
-    for iteration in range(NUM_ITERATIONS):    
-        print(f"\n Iteration {iteration + 1}/{NUM_ITERATIONS}")
-
-        CHUNK_SIZE = 5  # ✅ safe default; 3–10 works well
-
-        for chunk, base_idx in chunk_list(nl_descriptions, CHUNK_SIZE):
-
-            print(f"  Processing rows {base_idx} → {base_idx + len(chunk) - 1}")
-
-            batch_output = askgpt_generate_LTL_batch(chunk)
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "batch-write":
+        path = sys.argv[2] if len(sys.argv) > 2 else csvHandler.batch_path(temperature=str(TEMPERATURE), model=SPEC)
+        write_batch_requests(path, nl_descriptions, ids)
+        sys.exit(0)
+    if command == "batch-fabricate":
+        fabricate_batch_results(sys.argv[2], sys.argv[3], ids, ltl_references)
+        sys.exit(0)
+    answers = None
+    num_iterations = NUM_ITERATIONS
+    if command == "batch-ingest":
+        answers = load_batch_results(sys.argv[2], nl_descriptions, ids)
+    outcome_counts = {outcome: 0 for outcome in nuXmvHandler.Outcome}
+    executor = equivalenceExecutor.EquivalenceExecutor(workers=NUM_WORKERS, job_timeout=JOB_TIMEOUT)
+    if COLLECT_METRICS:
+        metrics_path = csvHandler.metrics_path(temperature=str(TEMPERATURE), model=SPEC)
+        nuXmvHandler.METRICS = checkMetrics.MetricsRecorder(metrics_path)
+    scheduler = None
+    if ASYNC_GENERATION and answers is None:
+        scheduler = llmScheduler.LLMScheduler(cache=LLM_CACHE)
+    sizer = batchProtocol.ChunkSizer(CHUNK_SIZE, MAX_COMPLETION_TOKENS)
 
-            generated_formulas = [
-                line.strip() for line in batch_output.split("\n") if line.strip()
+    # Iteration Loop
+    for iteration in range(num_iterations):    
+        print(f"\n Iteration {iteration + 1}/{num_iterations}")
+
+        chunks = []
+        chunk_inputs = chunk_list(nl_descriptions, sizer)
+        if answers is not None:
+            # Chunks as they were written to the batch file
+            chunk_inputs = [
+                (nl_descriptions[base_idx:base_idx + size], base_idx)
+                for base_idx, (size, _, _) in sorted(answers.get(iteration, {}).items())
+            ]
+        elif scheduler is not None:
+            # All chunks are generated concurrently (at the current chunk size), answers are taken in base_idx order
+            chunk_inputs = list(chunk_inputs)
+            generations = [
+                scheduler.submit(generation_request(chunk, ids[base_idx:base_idx + len(chunk)]), iteration)
+                for chunk, base_idx in chunk_inputs
             ]
 
-            # Safety guard
-            if len(generated_formulas) != len(chunk):
-                print(
-                    f"Warning: Expected {len(chunk)} results, got {len(generated_formulas)}"
-                )
-                generated_formulas = (
-                    generated_formulas + ["ERROR"] * len(chunk)
-                )[:len(chunk)]
+        for k, (chunk, base_idx) in enumerate(chunk_inputs):
+
+            chunk_ids = ids[base_idx:base_idx + len(chunk)]
+            prompt_tokens = llmScheduler.prompt_tokens(generation_request(chunk, chunk_ids))
+            print(f"  Processing rows {base_idx} → {base_idx + len(chunk) - 1} (prompt ~{prompt_tokens} tokens)")
+
+            failure = None
+            if answers is not None:
+                _, batch_output, failure = answers[iteration][base_idx]
+                batch_output = batch_output or ""
+            elif scheduler is not None:
+                batch_output = generations[k].result()
+            else:
+                batch_output = askgpt_generate_LTL_batch(chunk, chunk_ids, iteration)
+
+            # Formulas are matched to requirements by ID, IDs still missing after the repairs
+            # are not checked and count as no answer (an ingested batch is offline, it is not repaired)
+            rounds = 0 if answers is not None else MAX_REPAIR_ROUNDS
+            found = salvage_formulas(batch_output, chunk, chunk_ids, iteration, sizer, scheduler, rounds)
+            generated_formulas = [found.get(req_id) for req_id in chunk_ids]
+            no_answer = failure or "no formula for the ID in the answer"
+
+            # Check the whole chunk against the model in one nuXmv run
+            checked = [
+                local_idx for local_idx in range(len(chunk))
+                if ltl_references[base_idx + local_idx].strip() and generated_formulas[local_idx] is not None
+            ]
+            # (runs on the worker pool while the next chunk is generated)
+            executor.submit(
+                nuXmvHandler.check_equivalence_batch,
+                SYSTEM,
+                [(ltl_references[base_idx + i], generated_formulas[i]) for i in checked],
+                [ids[base_idx + i] for i in checked],
+                weight=len(checked),
+                default=[nuXmvHandler.CheckResult(nuXmvHandler.Outcome.TIMEOUT, "executor")] * len(checked)
+            )
+            chunks.append((base_idx, generated_formulas, checked, no_answer))
+
+        # Results come back in submission order, so the Summary counters stay correct
+        for (base_idx, generated_formulas, checked, no_answer), verdicts in zip(chunks, executor.results()):
+            chunk_verdicts = dict(zip(checked, verdicts))
 
             # Validate each generated LTL formula
             for local_idx, generated in enumerate(generated_formulas):
@@ -123,11 +305,20 @@ if __name__ == "__main__":
                 entry = csvData[global_idx]
                 reference = ltl_references[global_idx]
                 req_id = ids[global_idx]
-                print(f"    ID {req_id}: Generated ptLTL: {generated}   Reference ptLTL: {reference}")
+                print(f"    ID {req_id}: Generated ptLTL: {generated or f'none ({no_answer})'}   Reference ptLTL: {reference}")
                 result2 = "N/A"
+                reason = ""
+
+                if generated is None and reference.strip():
+                    check = nuXmvHandler.CheckResult(nuXmvHandler.Outcome.NO_ANSWER, "llm")
+                    result2 = check.verdict
+                    reason = no_answer
+                    outcome_counts[check.outcome] += 1
 
-                if reference and reference.strip():
-                    result2 = EQUIVALENCE_HANDLER(reference, generated)
+                if local_idx in chunk_verdicts:
+                    check = chunk_verdicts[local_idx]
+                    result2 = check.verdict
+                    outcome_counts[check.outcome] += 1
 
                     if result2 is True:
                         success_counts[req_id] += 1
@@ -137,10 +328,29 @@ if __name__ == "__main__":
                         "Summary": f"{success_counts[req_id]}/{iteration + 1}",
                         "ID": req_id,
                         "ptLTL": reference if reference else "None",
-                        "Generated ptLTL": generated,
-                        "Equivalence Check": result2
+                        "Generated ptLTL": generated or "",
+                        "Equivalence Check": result2,
+                        "Outcome": check.outcome.value,
+                        "Engine": check.engine,
+                        "Check Seconds": f"{check.seconds:.3f}",
+                        "Reason": reason
                     })
 
 
     # Step 6: Save results to CSV
-    csvHandler.save_results_to_csv(results, temperature=str(TEMPERATURE), model=SPEC)
\ No newline at end of file
+    csvHandler.save_results_to_csv(results, temperature=str(TEMPERATURE), model=SPEC)
+    executor.close()
+    executor.report()
+    if scheduler is not None:
+        scheduler.close()
+        scheduler.report()
+    LLM_CACHE.report()
+    LLM_CACHE.close()
+    print("Outcomes: " + ", ".join(f"{outcome.value} {count}" for outcome, count in outcome_counts.items()))
+    nuXmvHandler.SESSION_POOL.report()
+    nuXmvHandler.VERDICT_CACHE.report()
+    nuXmvHandler.TRACE_LIBRARY.report()
+    if COLLECT_METRICS:
+        nuXmvHandler.METRICS.close()
+        print(f"Slowest requirements ({metrics_path}):")
+        checkMetrics.summarize(metrics_path)
\ No newline at end of file
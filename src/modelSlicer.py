@@ -0,0 +1,102 @@
+import re
+import functools
+import ltlParser
+
+
+IDENT = re.compile(r"[A-Za-z_][A-Za-z0-9_$#]*")
+SECTIONS = ("IVAR", "VAR", "FROZENVAR", "DEFINE")
+KEYWORDS = {
+    "MODULE", "main", "IVAR", "VAR", "FROZENVAR", "DEFINE", "boolean", "array", "of",
+    "TRUE", "FALSE", "xor", "xnor", "mod", "H", "O", "Y", "Z", "S", "G", "F", "X", "U",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def parse_model(model):
+    """Split an SMV header into declarations.
+
+    Returns (variables, defines): variables maps name -> (section, type, comment)
+    and defines maps name -> expression, both in declaration order.
+    """
+    variables = {}
+    defines = {}
+    section = None
+    for raw in model.split("\n"):
+        line, _, comment = raw.partition("--")
+        line = line.strip()
+        if not line:
+            continue
+        if line in SECTIONS:
+            section = line
+            continue
+        if section == "DEFINE" and ":=" in line:
+            name, expr = line.rstrip(";").split(":=", 1)
+            defines[name.strip()] = expr.strip()
+        elif section in ("IVAR", "VAR", "FROZENVAR") and ":" in line:
+            name, typ = line.rstrip(";").split(":", 1)
+            variables[name.strip()] = (section, typ.strip(), comment.strip())
+    return variables, defines
+
+
+def formula_identifiers(formula):
+    try:
+        return ltlParser.identifiers(ltlParser.parse(formula))
+    except ltlParser.ParseError:
+        # Unparseable (e.g. array indexing): fall back to every identifier-looking token
+        return set(IDENT.findall(formula)) - KEYWORDS
+
+
+def cone_of_influence(model, formulas):
+    """Variables and DEFINEs the formulas depend on, following DEFINE bodies transitively."""
+    variables, defines = parse_model(model)
+    todo = set()
+    for formula in formulas:
+        todo |= formula_identifiers(formula)
+
+    used_vars, used_defines = set(), set()
+    while todo:
+        name = todo.pop()
+        if name in defines and name not in used_defines:
+            used_defines.add(name)
+            todo |= set(IDENT.findall(defines[name])) - KEYWORDS
+        elif name in variables:
+            used_vars.add(name)
+    return used_vars, used_defines
+
+
+def slice_model(model, formulas, inputs=()):
+    """Model declaring only what `formulas` mention.
+
+    Sound for equivalence checking: the model has no transition constraints,
+    so dropping variables the formulas never read cannot change a verdict.
+    Variables listed in `inputs` are declared as IVAR, which nuXmv encodes
+    without a next-state copy; with unconstrained variables every value
+    sequence is a path either way. Identifiers that are not declared are left
+    for nuXmv to report.
+    """
+    variables, defines = parse_model(model)
+    used_vars, used_defines = cone_of_influence(model, formulas)
+
+    sections = {"IVAR": [], "VAR": [], "FROZENVAR": []}
+    for name, (section, typ, comment) in variables.items():
+        if name not in used_vars:
+            continue
+        if name in inputs and section == "VAR":
+            section = "IVAR"
+        line = f"        {name} : {typ};"
+        sections[section].append(f"{line} -- {comment}" if comment else line)
+
+    if not sections["VAR"] and not sections["FROZENVAR"]:
+        # Keep one state variable so the model always has a state space to explore
+        sections["VAR"].append("        _slice_state : boolean;")
+
+    lines = ["", "    MODULE main"]
+    for section in ("IVAR", "VAR", "FROZENVAR"):
+        if sections[section]:
+            lines += [f"    {section}"] + sections[section] + [""]
+    if used_defines:
+        lines.append("    DEFINE")
+        lines += [f"        {name} := {expr};" for name, expr in defines.items() if name in used_defines]
+        lines.append("")
+    return "\n".join(lines)
+
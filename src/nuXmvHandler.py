@@ -3,12 +3,86 @@ import tempfile
 import os
 import re
 import unicodedata
+import atexit
+import threading
+import collections
+import time
+from enum import Enum
+from typing import NamedTuple, Optional
+import nuXmvSession
+import nuXmvPortfolio
+import verdictCache
+import checkMetrics
+import traceLibrary
+import ltlParser
+import formulaValidator
+import ptltlEngine
+import traceFuzzer
+import modelSlicer
+import domainAbstraction
+import systemRegistry
+
+
+NUXMV_BINARY = nuXmvSession.NUXMV_BINARY
+NUXMV_TIMEOUT = 45  # seconds
+
+# Keep warm `nuXmv -int` sessions per system model for one-pair checks (run_check) instead of one
+# process per check. Sessions hold the whole model, unsliced, so every check of a system reuses them.
+# Chunks are checked in one nuXmv run each (run_batch) on their sliced model
+USE_SESSION_POOL = True
+SESSION_POOL = nuXmvSession.SessionPool(
+    binary=NUXMV_BINARY, timeout=NUXMV_TIMEOUT, max_sessions=os.cpu_count() or 1
+)
+atexit.register(SESSION_POOL.close)
+
+# Verdicts are keyed by the normalized pair, the model text and the engine version
+USE_VERDICT_CACHE = True
+VERDICT_CACHE = verdictCache.VerdictCache()
+atexit.register(VERDICT_CACHE.close)
+_ENGINE = None
+# Outcome of pairs whose check reached no verdict (timeout, error), reported to concurrent duplicates
+_UNDECIDED = {}
+
+# Counterexamples are kept per model and reference, new candidates are replayed on them first
+USE_TRACE_LIBRARY = True
+TRACE_LIBRARY = traceLibrary.TraceLibrary()
+atexit.register(TRACE_LIBRARY.close)
+
+# Check G ((f1) <-> (f2)), agreement at every position, instead of (f1) <-> (f2), which
+# only compares the initial state (see equivalence_spec). All engines answer the chosen question
+EVERY_POSITION = True
+
+# Reject malformed generated formulas (syntax, forbidden future operators, undeclared names) up front
+USE_VALIDATION = True
+# Decide pure past-time pairs in-process with product monitors, nuXmv only for the rest
+USE_NATIVE_ENGINE = True
+# Look for a separating random trace (traceFuzzer.NUM_TRACES of traceFuzzer.TRACE_LENGTH) before nuXmv
+USE_FUZZING = True
+
+# Checks timing out on the cheapest engine (BDD) are raced on BDD, BMC and IC3
+USE_PORTFOLIO = True
+
+# First attempts get TIMEOUT_MARGIN x the system's recent p95 latency (see first_timeout),
+# a timeout escalates to NUXMV_TIMEOUT
+MIN_TIMEOUT = 2  # seconds
+TIMEOUT_MARGIN = 3
+LATENCY_HISTORY = 200  # checks per system
+_LATENCIES = {}
+_LATENCY_LOCK = threading.Lock()
+
+# Set to a checkMetrics.MetricsRecorder to write one metrics record per check (main.py does);
+# nuXmv sessions and batch runs then also report CPU time, peak memory and BDD statistics
+METRICS = None
+
+# Emit models declaring only the variables (and DEFINEs) the checked formulas mention
+USE_SLICING = True
+# Shrink ranged integer variables to the values that matter for the checked formulas
+USE_DOMAIN_ABSTRACTION = True
+# Reductions already reported, each is printed once per system
+_REPORTED_ABSTRACTIONS = set()
 
 
 def normalize(f: str) -> str:
-    # --- Normalize Unicode form ---
-    f = unicodedata.normalize("NFKD", f)
-
     # --- Replace known math/logical Unicode operators ---
     replacements = {
         "−": "-",   
@@ -34,13 +108,113 @@ def normalize(f: str) -> str:
     for k, v in replacements.items():
         f = f.replace(k, v)
 
+    # --- Normalize Unicode form ---
+    # (after the replacements, NFKD would otherwise split "≠" into "=" + U+0338)
+    f = unicodedata.normalize("NFKD", f)
+
     # --- Collapse repeated whitespace ---
     f = re.sub(r"\s+", " ", f).strip()
 
     return f
 
 
-def responseHandler(model, f1, f2):
+# SMV headers are generated once per process from the declarative system registry
+MODELS = {name: systemRegistry.smv_header(name) for name in systemRegistry.system_names()}
+
+
+def input_variables(system):
+    return systemRegistry.input_variables(system)
+
+
+def check_model(system, formulas):
+    model = MODELS[system]
+    if USE_SLICING:
+        model = modelSlicer.slice_model(model, formulas, input_variables(system))
+
+    if USE_DOMAIN_ABSTRACTION:
+        model, reductions = domainAbstraction.abstract_model(model, formulas)
+        if reductions:
+            summary = ", ".join(f"{name} {old}→{new}" for name, (old, new) in reductions.items())
+            if (system, summary) not in _REPORTED_ABSTRACTIONS:
+                _REPORTED_ABSTRACTIONS.add((system, summary))
+                print(f"    Domain abstraction ({system}): {summary}")
+    return model
+
+
+def equivalence_spec(f1, f2):
+    # A bare (f1) <-> (f2) only compares the initial state, where H and O (and Y, Z, S)
+    # collapse onto their operand; EVERY_POSITION asks for agreement everywhere
+    if EVERY_POSITION:
+        return f"G (({f1}) <-> ({f2}))"
+    return f"({f1}) <-> ({f2})"
+
+
+class Outcome(Enum):
+    EQUIVALENT = "equivalent"
+    NOT_EQUIVALENT = "not equivalent"
+    TIMEOUT = "timeout"
+    SYNTAX_ERROR = "syntax error"
+    UNDECLARED_IDENTIFIER = "undeclared identifier"
+    ENGINE_ERROR = "engine error"
+    NO_ANSWER = "no answer"  # the LLM gave no formula for the requirement, nothing was checked
+
+    @property
+    def verdict(self):
+        """True/False for a decided pair, None for timeouts and errors."""
+        if self is Outcome.EQUIVALENT:
+            return True
+        if self is Outcome.NOT_EQUIVALENT:
+            return False
+        return None
+
+    @classmethod
+    def of(cls, verdict):
+        return cls.EQUIVALENT if verdict else cls.NOT_EQUIVALENT
+
+
+class CheckResult(NamedTuple):
+    outcome: Outcome
+    engine: str  # what decided: validator, canonical, trace, ptltl, fuzz, cache, bdd-session, bdd, bdd-batch, bmc, ic3, ...
+    trace: Optional[list] = None  # counterexample when not equivalent and one was printed
+    seconds: float = 0.0
+    stats: Optional[dict] = None  # nuXmv resource usage, collected when METRICS is set
+
+    @property
+    def verdict(self):
+        return self.outcome.verdict
+
+
+UNDECLARED = re.compile(r"undefined|undeclared|not declared", re.IGNORECASE)
+# Ill-typed formulas are reported together with syntax errors
+SYNTAX = re.compile(r"syntax error|parse error|illegal|type error|unexpected", re.IGNORECASE)
+
+
+def classify_output(output, error_output):
+    if "is true" in output:
+        return Outcome.EQUIVALENT
+    if "is false" in output:
+        return Outcome.NOT_EQUIVALENT
+    if UNDECLARED.search(error_output):
+        return Outcome.UNDECLARED_IDENTIFIER
+    if SYNTAX.search(error_output):
+        return Outcome.SYNTAX_ERROR
+    return Outcome.ENGINE_ERROR
+
+
+def interpret_output(output, error_output, f1, f2):
+
+    outcome = classify_output(output, error_output)
+    if outcome.verdict is None:
+        print(f"⚠️ Unexpected NuXMV output format ({outcome.value})")
+        print("---- STDOUT ----")
+        print("Reference:", f1, "\n", "Generated:", f2)
+        print("---- STDERR ----")
+        print(error_output)
+        print("----------------")
+    return outcome
+
+
+def run_nuxmv(model, timeout=NUXMV_TIMEOUT):
 
     # Create temporary .smv file
     with tempfile.NamedTemporaryFile(suffix=".smv", delete=False, mode="w", encoding="utf-8") as tmp:
@@ -48,540 +222,478 @@ def responseHandler(model, f1, f2):
         tmp_path = tmp.name
 
     try:
+        return subprocess.run(
+            [NUXMV_BINARY, tmp_path],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    finally:
+        # Ensure temporary file is always removed
+        os.remove(tmp_path)
+
+
+def responseHandler(model, f1, f2):
+
+    try:
+        result = run_nuxmv(model)
+    except subprocess.TimeoutExpired:
+        print("⏳ NuXMV timed out — returning empty")
+        return
+
+    return interpret_output(result.stdout, result.stderr, f1, f2).verdict
+
+
+def nuxmv_engine():
+    global _ENGINE
+
+    if _ENGINE is None:
         try:
-            result = subprocess.run(
-                ["nuxmv.exe", tmp_path],
-                capture_output=True,
-                text=True,
-                timeout=45       # seconds
-            )
+            banner = subprocess.run([NUXMV_BINARY, "-h"], capture_output=True, text=True, timeout=10)
+            match = re.search(r"nuXmv (\d[\w.\-]*)", banner.stdout + banner.stderr)
+            _ENGINE = f"nuXmv-{match.group(1) if match else 'unknown'}"
+        except (OSError, subprocess.TimeoutExpired):
+            _ENGINE = "nuXmv-unknown"
+        # Verdicts also depend on the spec checked, see equivalence_spec
+        if EVERY_POSITION:
+            _ENGINE += " G"
+    return _ENGINE
+
+
+def record_latency(system, seconds):
+    with _LATENCY_LOCK:
+        _LATENCIES.setdefault(system, collections.deque(maxlen=LATENCY_HISTORY)).append(seconds)
+
+
+def first_timeout(system, formulas):
+    """Budget of the first attempt: TIMEOUT_MARGIN times the system's recent p95
+    latency (at least MIN_TIMEOUT), plus that much again per 400 characters of formulas."""
+    with _LATENCY_LOCK:
+        history = sorted(_LATENCIES.get(system, ()))
+    budget = MIN_TIMEOUT
+    if history:
+        budget = max(budget, TIMEOUT_MARGIN * history[int(0.95 * (len(history) - 1))])
+    budget *= 1 + sum(len(f) for f in formulas) / 400
+    return min(budget, NUXMV_TIMEOUT)
+
+
+def run_check(system, model, f1, f2):
+    """Check one pair with nuXmv, escalating on timeout.
+
+    The cheap BDD path runs first with an adaptive budget. If it times out
+    the engine portfolio (or, without it, BDD again) gets the full NUXMV_TIMEOUT.
+    """
+    spec = equivalence_spec(f1, f2)
+    budget = first_timeout(system, [f1, f2])
+    start = time.perf_counter()
+
+    try:
+        if USE_SESSION_POOL:
+            # Warm session already holds the encoded (full) model, only the spec is sent
+            stats = {} if METRICS is not None else None
+            output = SESSION_POOL.check(system, model, spec, budget, stats)
+            if output is None:
+                return CheckResult(Outcome.ENGINE_ERROR, "bdd-session")
+            outcome = interpret_output(output, output, f1, f2)
+            trace = traceLibrary.parse_counterexample(output)
+            result = CheckResult(outcome, "bdd-session", trace, stats=stats)
+        else:
+            run = run_nuxmv(check_model(system, [f1, f2]) + f"\n    LTLSPEC {spec}\n", budget)
+            outcome = interpret_output(run.stdout, run.stderr, f1, f2)
+            result = CheckResult(outcome, "bdd", traceLibrary.parse_counterexample(run.stdout))
+        if result.verdict is not None:
+            record_latency(system, time.perf_counter() - start)
+        return result
+    except (TimeoutError, subprocess.TimeoutExpired):
+        pass
+
+    # Escalated checks are recorded too, so hard systems get larger first budgets
+    start = time.perf_counter()
+    sliced = check_model(system, [f1, f2])
+    if not USE_PORTFOLIO:
+        print(f"⏳ NuXMV needed more than {budget:.1f} s — retrying with {NUXMV_TIMEOUT} s")
+        try:
+            run = run_nuxmv(sliced + f"\n    LTLSPEC {spec}\n", NUXMV_TIMEOUT)
         except subprocess.TimeoutExpired:
             print("⏳ NuXMV timed out — returning empty")
-            return
+            return CheckResult(Outcome.TIMEOUT, "bdd")
+        outcome = interpret_output(run.stdout, run.stderr, f1, f2)
+        if outcome.verdict is not None:
+            record_latency(system, time.perf_counter() - start)
+        return CheckResult(outcome, "bdd", traceLibrary.parse_counterexample(run.stdout))
+
+    # Hard check: race the engines on the sliced model with the full budget
+    print(f"⏳ NuXMV needed more than {budget:.1f} s — racing BDD, BMC and IC3")
+    verdict, engine, error_output = nuXmvPortfolio.race(
+        sliced, spec, NUXMV_BINARY, NUXMV_TIMEOUT
+    )
+    if verdict is not None:
+        record_latency(system, time.perf_counter() - start)
+        return CheckResult(Outcome.of(verdict), engine)
+    if not error_output.strip():
+        print("⏳ NuXMV portfolio timed out — returning empty")
+        return CheckResult(Outcome.TIMEOUT, engine)
+    return CheckResult(interpret_output("", error_output, f1, f2), engine)
 
-    finally:
-        # Ensure temporary file is always removed
-        os.remove(tmp_path)
 
-    output = result.stdout
-    error_output = result.stderr
+def refute_by_replay(model, reference, f1, f2):
+    traces = TRACE_LIBRARY.get(model, reference)
+    index = ptltlEngine.replay(model, f1, f2, [trace for _, trace in traces], EVERY_POSITION) if traces else None
+    TRACE_LIBRARY.record(None if index is None else traces[index][0])
+    return index is not None
 
-    if "is true" in output:
-        return True
-    elif "is false" in output:
-        return False
-    else:
-        print("⚠️ Unexpected NuXMV output format")
-        print("---- STDOUT ----")
-        print("Reference:", f1, "\n", "Generated:", f2)
-        print("---- STDERR ----")
-        print(error_output)
-        print("----------------")
-        return 
 
+def remember_trace(model, reference, trace):
+    if USE_TRACE_LIBRARY and trace:
+        TRACE_LIBRARY.add(model, reference, trace)
 
-def check_equivalence_master(formula1, formula2):
-    
-    f1 = normalize(formula1)
-    f2 = normalize(formula2)
 
-    model = f"""
-    MODULE main
+def refute_by_fuzzing(model, reference, f1, f2):
+    witness = traceFuzzer.fuzz_model(model, f1, f2, every_position=EVERY_POSITION)
+    if witness is None:
+        return False
+    trace, loop = witness
+    if loop is None:
+        # Finite past-time witnesses can be replayed later, lassos cannot
+        remember_trace(model, reference, trace)
+    return True
+
 
-    IVAR
-      classifier : {{0, 1, 2}};
-      distance_to_target : 0..10;
+VALIDATION_OUTCOMES = {
+    "syntax": Outcome.SYNTAX_ERROR,
+    "future": Outcome.SYNTAX_ERROR,
+    "undeclared": Outcome.UNDECLARED_IDENTIFIER,
+}
 
-    VAR
-      alert : boolean;
-      halt : boolean;
-      slowdown : boolean;
-      turnoffUVC : boolean;
-      OpState : {{0, 1, 2, 3}};
 
-    DEFINE
-      dgt_3 := distance_to_target > 3;
-      dgt_7 := distance_to_target > 7;
+def declared_identifiers(system):
+    variables, defines = modelSlicer.parse_model(MODELS[system])
+    return set(variables) | set(defines)
 
-    LTLSPEC ({f1}) <-> ({f2})
+
+def reject_invalid(system, reference, generated):
+    """CheckResult for a generated formula the validator rejects, None if it is well-formed."""
+    try:
+        reference = ltlParser.parse(reference)
+    except ltlParser.ParseError:
+        # Reference beyond the validator's grammar, leave the pair to nuXmv
+        return None
+    # Future operators and names missing from the model are accepted when the reference uses them too
+    allow_future = bool(ltlParser.operators(reference) & set(ltlParser.FUTURE))
+    identifiers = declared_identifiers(system) | ltlParser.identifiers(reference)
+    problem = formulaValidator.validate(generated, identifiers, allow_future=allow_future)
+    if problem is None:
+        return None
+    print(f"⚠️ Rejected generated formula {generated!r}: {problem.message}")
+    return CheckResult(VALIDATION_OUTCOMES[problem.kind], "validator")
+
+
+def decide_in_process(model, prepared):
+    """Stages that need no model checker. Returns a CheckResult or None."""
+    same, (f1, f2), (reference, _) = prepared
+    if same:
+        return CheckResult(Outcome.EQUIVALENT, "canonical")
+
+    if USE_TRACE_LIBRARY and refute_by_replay(model, reference, f1, f2):
+        return CheckResult(Outcome.NOT_EQUIVALENT, "trace")
+
+    if USE_NATIVE_ENGINE:
+        verdict, trace = ptltlEngine.check_equivalence(model, f1, f2, EVERY_POSITION)
+        if verdict is not None:
+            remember_trace(model, reference, trace)
+            return CheckResult(Outcome.of(verdict), "ptltl", trace)
+
+    if USE_FUZZING and refute_by_fuzzing(model, reference, f1, f2):
+        return CheckResult(Outcome.NOT_EQUIVALENT, "fuzz")
+    return None
+
+
+def record_metrics(system, requirement, reference, generated, result, cpu_seconds, batch_size=1):
+    """One metrics record: timing, formula and sliced model sizes, nuXmv usage if any."""
+    sizes = []
+    for formula in (reference, generated):
+        try:
+            sizes.append(ltlParser.size(ltlParser.parse(formula)))
+        except ltlParser.ParseError:
+            sizes.append(None)
+    used_vars, used_defines = modelSlicer.cone_of_influence(MODELS[system], [reference, generated])
+    fields = {
+        "system": system,
+        "requirement": requirement,
+        "reference": reference,
+        "generated": generated,
+        "outcome": result.outcome.value,
+        "engine": result.engine,
+        "wall_seconds": round(result.seconds, 6),
+        "python_cpu_seconds": round(cpu_seconds, 6),
+        "reference_size": sizes[0],
+        "generated_size": sizes[1],
+        "model_variables": len(used_vars),
+        "model_defines": len(used_defines),
+        "batch_size": batch_size,
+    }
+    for name, value in (result.stats or {}).items():
+        fields[f"nuxmv_{name}"] = value
+    METRICS.record(**fields)
+
+
+def check_equivalence_detailed(system, formula1, formula2, requirement=None):
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    result = _check_equivalence_detailed(system, formula1, formula2)
+    result = result._replace(seconds=time.perf_counter() - start)
+    if METRICS is not None:
+        cpu = time.thread_time() - cpu_start
+        record_metrics(system, requirement, normalize(formula1), normalize(formula2), result, cpu)
+    return result
+
+
+def waited_result(key, verdict, seconds=0.0):
+    """CheckResult for a pair whose check ran concurrently elsewhere."""
+    if verdict is None:
+        # No verdict: report how the other check ended (an unexpected failure is an engine error)
+        return CheckResult(_UNDECIDED.get(key, Outcome.ENGINE_ERROR), "cache", seconds=seconds)
+    return CheckResult(Outcome.of(verdict), "cache", seconds=seconds)
+
+
+def _check_equivalence_detailed(system, formula1, formula2):
+
+    formula1, formula2 = normalize(formula1), normalize(formula2)
+    if USE_VALIDATION:
+        result = reject_invalid(system, formula1, formula2)
+        if result is not None:
+            return result
+
+    # Identical canonical forms need no model checker, the rest is checked simplified
+    prepared = ltlParser.prepare_pair(formula1, formula2)
+    _, (f1, f2), keys = prepared
+    model = MODELS[system]
+    reference = keys[0]
+
+    result = decide_in_process(model, prepared)
+    if result is not None:
+        return result
+
+    if not USE_VERDICT_CACHE:
+        result = run_check(system, model, f1, f2)
+        remember_trace(model, reference, result.trace)
+        return result
+
+    decided = {}
+
+    def compute():
+        result = run_check(system, model, f1, f2)
+        remember_trace(model, reference, result.trace)
+        decided["result"] = result
+        if result.verdict is None:
+            _UNDECIDED[key] = result.outcome
+        return result.verdict
+
+    engine = nuxmv_engine()
+    key = verdictCache.make_key(*keys, model, engine)
+    verdict = VERDICT_CACHE.compute(key, compute, engine)
+    if "result" in decided:
+        return decided["result"]
+    return waited_result(key, verdict)
+
+
+def check_equivalence(system, formula1, formula2):
+    return check_equivalence_detailed(system, formula1, formula2).verdict
+
+
+def run_batch(model, specs, timeout=NUXMV_TIMEOUT, stats=False):
+    """Check named LTLSPECs in one nuXmv run.
+
+    `specs` maps property name -> LTL spec. Returns (verdicts, traces, bad, stderr, usage)
+    where verdicts maps name -> True/False, traces maps the false ones to their
+    counterexample and bad maps the names nuXmv rejected while reading/encoding
+    the model (attributed through the error line number) to their error lines.
+    usage holds the run's resource figures when `stats` is set.
     """
+    lines = model.rstrip("\n").split("\n") + [""]
+    spec_lines = {}
+    for name, spec in specs.items():
+        lines.append(f"    LTLSPEC NAME {name} := {spec}")
+        spec_lines[len(lines)] = name
 
-    return responseHandler(model, f1, f2)
+    with tempfile.NamedTemporaryFile(suffix=".smv", delete=False, mode="w", encoding="utf-8") as tmp:
+        tmp.write("\n".join(lines) + "\n")
+        smv_path = tmp.name
 
+    # Each check is preceded by an echoed marker so every verdict maps back to its name
+    script = [f'read_model -i "{smv_path.replace(os.sep, "/")}"', "go"]
+    for name in specs:
+        script += [f"echo @@ {name}", f"check_ltlspec -P {name}"]
+    if stats:
+        script += ["echo @@ @usage"] + checkMetrics.STATS_COMMANDS
+    script.append("quit")
 
-def check_equivalence_rover(formula1, formula2):
+    with tempfile.NamedTemporaryFile(suffix=".cmd", delete=False, mode="w", encoding="utf-8") as tmp:
+        tmp.write("\n".join(script) + "\n")
+        script_path = tmp.name
 
-    f1 = normalize(formula1)
-    f2 = normalize(formula2)
-
-    model = f"""
-    MODULE main
-    VAR
-    battery : 0..100;
-    chargePosition : 0..100;
-    recharge : boolean;
-    goal : 0..100;
-    pre_battery : 0..100;
-    n : 1..100;
-    plan : 0..100;
-    chargeNeeded_var : 0..100;
-    length_plan : 0..100;
-    batteryFull : boolean;
-    atGoal : boolean;
-    Obstacle : boolean;
-    currentPosition : 0..10;
-    initialPosition : 0..100;
-    currentPhysicalPosition : 0..100;
-    start : 0..100;
-    s0 : 0..100;
-    x : 0..100;
-    y : 0..100;
-    obstacle : 0..10;
-    Obstacle_currentPosition : boolean;
-    speed : 0..100;
-    removeGoalFromSet : boolean;
-
-    LTLSPEC ({f1}) <-> ({f2})
+    try:
+        result = subprocess.run(
+            [NUXMV_BINARY, "-source", script_path],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    finally:
+        os.remove(smv_path)
+        os.remove(script_path)
+
+    bad = {}
+    for line in result.stderr.splitlines():
+        for line_no in re.findall(r"line (\d+)", line):
+            if int(line_no) in spec_lines:
+                name = spec_lines[int(line_no)]
+                bad[name] = bad.get(name, "") + line + "\n"
+
+    verdicts, traces, usage = {}, {}, {}
+    for segment in result.stdout.split("@@ ")[1:]:
+        name, _, body = segment.partition("\n")
+        name = name.strip()
+        if name == "@usage":
+            usage = checkMetrics.parse_stats(body)
+        elif "is true" in body:
+            verdicts[name] = True
+        elif "is false" in body:
+            verdicts[name] = False
+            traces[name] = traceLibrary.parse_counterexample(body)
+
+    return verdicts, traces, bad, result.stderr, usage
+
+
+def check_equivalence_batch(system, pairs, requirements=None):
+    """Check a list of (reference, generated) pairs against one system model in a single nuXmv run.
+
+    Returns a list of CheckResult in the order of `pairs`. Properties that
+    break parsing are isolated and the remaining ones are re-run.
+    `requirements` (IDs per pair) only label the metrics records.
     """
-    return responseHandler(model, f1, f2)      
+    model = MODELS[system]
+    pairs = [(normalize(f1), normalize(f2)) for f1, f2 in pairs]
+    prepared = [ltlParser.prepare_pair(f1, f2) for f1, f2 in pairs]
+    normalized = [simplified for _, simplified, _ in prepared]
+    results = [None] * len(pairs)
+    cpu = [0.0] * len(pairs)
+    batch_sizes = [1] * len(pairs)
+    pending = {}
+    owned, waiting = {}, {}
+
+    for i, (_, simplified, keys) in enumerate(prepared):
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        if USE_VALIDATION:
+            results[i] = reject_invalid(system, *pairs[i])
+        if results[i] is None:
+            results[i] = decide_in_process(model, prepared[i])
+        cpu[i] = time.thread_time() - cpu_start
+        if results[i] is not None:
+            results[i] = results[i]._replace(seconds=time.perf_counter() - start)
+            continue
+        if not USE_VERDICT_CACHE:
+            pending[f"p_{i}"] = i
+            continue
+        key = verdictCache.make_key(*keys, model, nuxmv_engine())
+        verdict = VERDICT_CACHE.get(key)
+        if verdict is not None:
+            results[i] = CheckResult(Outcome.of(verdict), "cache", seconds=time.perf_counter() - start)
+            continue
+        if VERDICT_CACHE.begin(key):
+            owned[i] = key
+            pending[f"p_{i}"] = i
+        else:
+            # Same pair is being checked elsewhere (or earlier in this batch)
+            waiting[i] = key
 
+    try:
+        while pending:
+            specs = {name: equivalence_spec(*normalized[i]) for name, i in pending.items()}
+            batch_model = check_model(system, [f for i in pending.values() for f in normalized[i]])
+            budget = sum(first_timeout(system, normalized[i]) for i in pending.values())
+            start = time.perf_counter()
+            try:
+                found, traces, bad, _, usage = run_batch(batch_model, specs, budget, METRICS is not None)
+            except subprocess.TimeoutExpired:
+                print(f"⏳ NuXMV batch of {len(specs)} timed out — checking one by one")
+                found, traces, bad, usage = {}, {}, {}, {}
+            # The run's time (and CPU) is shared by the properties it settled
+            settled = max(1, len(found) + len(bad))
+            share = (time.perf_counter() - start) / settled
+            if found:
+                record_latency(system, share)
+            usage = {
+                name: value / settled if name in checkMetrics.CUMULATIVE else value
+                for name, value in usage.items()
+            } or None
+
+            for name, verdict in found.items():
+                i = pending.pop(name)
+                results[i] = CheckResult(Outcome.of(verdict), "bdd-batch", traces.get(name), share, usage)
+                batch_sizes[i] = settled
+                remember_trace(model, prepared[i][2][0], traces.get(name))
+
+            for name, errors in bad.items():
+                i = pending.pop(name)
+                print(f"⚠️ NuXMV rejected property {name} of the batch")
+                outcome = interpret_output("", errors, *normalized[i])
+                results[i] = CheckResult(outcome, "bdd-batch", seconds=share, stats=usage)
+                batch_sizes[i] = settled
+
+            if pending and not found and not bad:
+                # Nothing could be attributed, fall back to one check per pair
+                for name, i in pending.items():
+                    start = time.perf_counter()
+                    result = run_check(system, model, *normalized[i])
+                    results[i] = result._replace(seconds=time.perf_counter() - start)
+                    remember_trace(model, prepared[i][2][0], result.trace)
+                break
+    finally:
+        for i, key in owned.items():
+            if results[i] is not None and results[i].verdict is None:
+                _UNDECIDED[key] = results[i].outcome
+            VERDICT_CACHE.finish(key, results[i].verdict if results[i] else None, nuxmv_engine())
 
-def check_equivalence_abzrover_extended(formula1, formula2):
-    f1 = normalize(formula1)
-    f2 = normalize(formula2)
-
-    model = f"""
-    MODULE main
-    VAR
-        currentPosition : 0..1000;
-        obstacles : array 0..50 of boolean; -- presence map
-        GSObstacles : array 0..50 of boolean;
-        obstacleAccuracy : 0..100; -- percentage
-        perturbationInput : 0..1000;
-        prioritisedGoals : array 0..20 of 0..1000;
-        chargers : array 0..10 of 0..1000;
-        invalidMap : boolean;
-        goal : 0..1000;
-        safeLocation : 0..1000;
-        recharge : boolean;
-        atGoal : boolean;
-        noplan : boolean;
-        systemState : 0..10; -- encoded system-state finite set
-        plan2C : array 0..100 of 0..1000;
-        plan2D : array 0..100 of 0..1000;
-        plans : array 0..20 of 0..1000;
-        planTimeout : boolean;
-        batteryLevel : 0..100;
-        measuredBattery : 0..100;
-        movementCommands : 0..20;
-        velocityCommands : 0..20;
-        solarPanelsOpen : boolean;
-        batteryNeededToGoal : 0..100;
-        batteryNeededToCharger : 0..100;
-        communicationData : 0..20; -- encoded enum
-        completed : boolean;
-        noMoreViablePlans : boolean;
-        failed2Reconnect : boolean;
-        connectionStatus : 0..3; -- 0=ok 1=failed 2=reconnecting 3=timeout
-        responseData : 0..1000;
-        helperId : 0..50;
-        location : 0..1000;
-        failure : boolean;
-        failureCause : 0..10; -- symbolic failure classification
-        reboot : boolean;
-        requestHelp : boolean;
-        waitForHelpTimer : 0..1000;
-
-    LTLSPEC ({f1}) <-> ({f2})
-    """
+    for i, key in waiting.items():
+        start = time.perf_counter()
+        verdict = VERDICT_CACHE.wait(key)
+        results[i] = waited_result(key, verdict, time.perf_counter() - start)
 
-    return responseHandler(model, f1, f2)
+    if METRICS is not None:
+        for i, (reference, generated) in enumerate(pairs):
+            requirement = requirements[i] if requirements else None
+            record_metrics(system, requirement, reference, generated, results[i], cpu[i], batch_sizes[i])
+    return results
 
 
-def check_equivalence_drone(formula1, formula2):
-    f1 = normalize(formula1)
-    f2 = normalize(formula2)
-
-    model = f"""
-    MODULE main
-    VAR
-        SimulationMode : boolean;
-        SimulationModeRaspberry : boolean;
-        SimulateCommunications : boolean;
-        SimulatePackageSending : boolean;
-        RealMode : boolean;
-        SimulationLoopStart : boolean;
-        SimulationLoopFinish : boolean;
-        HILSimulationGazebo : boolean;
-        JetsonFailureDetectionRunning : boolean;
-        JetsonFailureTransitionToNucleo : boolean;
-        NucleoOnline : boolean;
-        NucleoFailureSwitchActiveNucleo : boolean;
-        NucleoOneControl : boolean;
-        SendNucleoOneControlMessage : boolean;
-        NucleoTwoControl : boolean;
-        SendNucleoTwoControlMessage : boolean;
-        ActiveNucleoFailureDetectionRunning : boolean;
-        ActiveNucleo : boolean;
-        MonitorPowerConsumption : boolean;
-        ReturnPowerConsumptionData : boolean;
-        SimulateFailureTransition : boolean;
-        SimulatePacketLoss : boolean;
-        SimulationDataSaved : boolean;
-        ServoMonitoring : boolean;
-        BatteryMonitoring : boolean;
-        UseRealTimeClock : boolean;
-        AttitudeMonitoring : boolean;
-        OverallSystemHealthMonitoring : boolean;
-        PacketLossRate : 0..100;
-        AcceptablePacketLoss : 0..100;
-        ElectricSystemsHealthMonitoring : boolean;
-        ControlLoopStartRaspberry : boolean;
-        ControlLoopStartNucleo : boolean;
-        ControlLoopFinish : boolean;
-        RaspberryFailureDetectionRunning : boolean;
-        EvaluateControllerPerformance : boolean;
-        MeasureControlTransition : boolean;
-        CollectHardwareExecutionTimes : boolean;
-        AssessHardwareTimePerformance : boolean;
-        ControlAlgorithmStart : boolean;
-        ControlAlgorithmFinish : boolean;
-        ControlLoopStart : boolean;
-        MonitorGroundSpeed : boolean;
-        SendGroundSpeedData : boolean;
-        MonitorWindSpeed : boolean;
-        SendWindSpeedData : boolean;
-        MonitorPitotTube : boolean;
-        SendPitotTubeData : boolean;
-        MonitorAlphaVane : boolean;
-        SendAlphaVaneData : boolean;
-        MonitorBetaVane : boolean;
-        SendBetaVaneData : boolean;
-        MonitorServoMotors : boolean;
-        SendServoMotorsData : boolean;
-        MonitorTiltAngles : boolean;
-        SendTiltAngleData : boolean;
-        MonitorAccelerations : boolean;
-        SendAccelerationsData : boolean;
-        MonitorBarometerAltitude : boolean;
-        SendBarometerAltitudeData : boolean;
-        MonitorRow : boolean;
-        SendRowData : boolean;
-        MonitorPitch : boolean;
-        SendPitchData : boolean;
-        MonitorYaw : boolean;
-        SendYawData : boolean;
-        MonitorAccelerometerData : boolean;
-        SendAccelerometerData : boolean;
-        MonitorMagnetometerData : boolean;
-        SendMagnetometerData : boolean;
-        MonitorGyroscopeData : boolean;
-        SendGyroscopeData : boolean;
-        MonitorCompassData : boolean;
-        SendCompassData : boolean;
-        MonitorMotorRPM : boolean;
-        SendMotorRPM : boolean;
-        MonitorBoardStatus : boolean;
-        SendBoardStatusData : boolean;
-        MonitorGPSLatitude : boolean;
-        MonitorGPSLongitude : boolean;
-        MonitorGPSAltitude : boolean;
-        MonitorGPSHomePosition : boolean;
-        SendGPSData : boolean;
-        SatelliteShadowing : boolean;
-        NoReceptionLoS : boolean;
-        SignalDiffraction : boolean;
-        MultipathEffects : boolean;
-        PositioningAccuracy : boolean;
-        MonitorRTKData : boolean;
-        SendRTKData : boolean;
-        MonitorPropellerRPM : boolean;
-        SendPropellerRPMData : boolean;
-        MonitorComponentsTemeratures : boolean;
-        SendComponentsTemperaturesData : boolean;
-        MonitorInternalTemperature : boolean;
-        SendInternalTemperatureData : boolean;
-        MonitorBayAreaTemperature : boolean;
-        SendBayAreaTemperatureData : boolean;
-        MonitoringEnabledRaspberry : boolean;
-        MonitorCommunicationQuality : boolean;
-        MonitoringEnabled : boolean;
-        ManageEnergySources : boolean;
-        MonitorBatteryStatus : boolean;
-        SendBatteryStatusData : boolean;
-        MonitorBatteryLevel : boolean;
-        SendBatteryLevelData : boolean;
-        MonitorBatteryVoltage : boolean;
-        SendBatteryVoltageData : boolean;
-        MonitorVoltageBusConsumption : boolean;
-        SendVoltageBusConsumptionData : boolean;
-        AutonomousFlightMode : boolean;
-        JetsonControl : boolean;
-        JetsonControlDisplay : boolean;
-        RemoteControlFlightMode : boolean;
-        NulceoControl : boolean;
-        NucleoControlDisplay : boolean;
-        NucleoControl : boolean;
-        FailsafeFlightMode : boolean;
-        MonitorBrushlessCurrent : boolean;
-        MonitorESCCurrent : boolean;
-        MonitorServoMotorCurrent : boolean;
-        DisplayCurrentController : boolean;
-        SendBatteryDischargeRateData : boolean;
-        MonitorBatteryDischargeRate : boolean;
-        MonitorAngularVelocity : boolean;
-        SendAngularVelocityData : boolean;
-        NucleoOneFailureDetectionRunning : boolean;
-        HILSimulation : boolean;
-        NucleoTwoFailureDetectionRunning : boolean;
-        true : boolean;
-        false : boolean;
-
-    LTLSPEC ({f1}) <-> ({f2})
-    """
+def check_equivalence_master(formula1, formula2):
+    return check_equivalence("master", formula1, formula2)
 
-    return responseHandler(model, f1, f2)
 
+def check_equivalence_rover(formula1, formula2):
+    return check_equivalence("rover", formula1, formula2)
 
-def check_equivalence_pipeline(formula1, formula2):
-    f1 = normalize(formula1)
-    f2 = normalize(formula2)
-
-    # variable_1, input integer variable_2, integer variable_3, bool variable_4, bool variable_5, integer constant variable_6, internal integer
-
-    model = f"""
-    MODULE main
-    VAR
-        variable_1 : 0..100; -- Input integer
-        variable_2 : 0..100; -- Integer
-        variable_3 : boolean; -- Boolean
-        variable_4 : boolean; -- Boolean
-        variable_5 : 0..100; -- Constant integer
-        variable_6 : 0..100; -- Internal integer
-
-    LTLSPEC ({f1}) <-> ({f2})
-    """
 
-    return responseHandler(model, f1, f2)
+def check_equivalence_abzrover_extended(formula1, formula2):
+    return check_equivalence("abzrover", formula1, formula2)
 
 
-def check_equivalence_stlpipeline(formula1, formula2):
-    f1 = normalize(formula1)
-    f2 = normalize(formula2)
-
-    # variable_1, input integer variable_2, integer variable_3, bool variable_4, bool variable_5, integer constant variable_6, internal integer
-
-    model = f"""
-    MODULE main
-    VAR
-        prop_1 : boolean; -- Boolean
-        prop_2 : boolean; -- Boolean
-        prop_3 : boolean; -- Boolean
-        prop_4 : boolean; -- Boolean
-        prop_5 : boolean; -- Boolean
-        prop_6 : boolean; -- Boolean
-        prop_7 : boolean; -- Boolean
-
-    LTLSPEC ({f1}) <-> ({f2})
-    """
+def check_equivalence_drone(formula1, formula2):
+    return check_equivalence("drone", formula1, formula2)
 
-    return responseHandler(model, f1, f2)
 
+def check_equivalence_pipeline(formula1, formula2):
+    return check_equivalence("pipeline", formula1, formula2)
 
-def check_equivalence_lungV(formula1, formula2):
 
-    f1 = normalize(formula1)
-    f2 = normalize(formula2)
-
-    model = f"""
-    MODULE main
-    VAR
-        ADCConnFailure : boolean;
-        ADCError : 0..10;
-        ADCRetries : 0..10;
-        BreathingCycleStart : boolean;
-        CONT : boolean;
-        ExpiratoryPhaseEnd : boolean;
-        ExpiratoryTime : 0..5000;
-        ExpiratoryTriggerSensitivity : 0..100;
-        Fail : boolean;
-        FailSafeMode : boolean;
-        FinalState : 0..10;
-        GBPS : 0..1000;
-        GUIConnected : boolean;
-        GUIFailure : boolean;
-        GUIResumeRequest : boolean;
-        ITS_PCV : boolean;
-        ITS_PSV : boolean;
-        IToE : 0..10;
-        IToE_AP : 0..10;
-        InhaleTriggerSensitivityPCV : 0..100;
-        InhaleTriggerSensitivityPSV : 0..100;
-        ItoE : 0..10;
-        ItoE_AP : 0..10;
-        ItoE_PCV : 0..10;
-        MaxP_insp : 0..100;
-        MinPEEPAtmAnalyzer : 0..50;
-        OutOfServiceWarning : boolean;
-        PCVInspTimeEnd : boolean;
-        PCVMode : boolean;
-        PCVModeSelected : boolean;
-        PSVMode : boolean;
-        PSVModeSelected : boolean;
-        P_insp : 0..100;
-        P_inspAP : 0..100;
-        P_inspPCV : 0..100;
-        P_inspPSV : 0..100;
-        Pass : boolean;
-        PeakV_E : 0..1000;
-        RM : boolean;
-        RMButton : boolean;
-        RR : 0..100;
-        RR_AP : 0..100;
-        RR_PCV : 0..100;
-        Seconds : 0..10000;
-        SelfTestFail : boolean;
-        SelfTestMode : boolean;
-        SensorUse : boolean;
-        Skip : boolean;
-        StandbyMode : boolean;
-        StartUpDone : boolean;
-        StartUpMode : boolean;
-        V_E : 0..1000;
-        _PRC_ : boolean;
-        airSupplyConnected : boolean;
-        alarmSettingsChanged : boolean;
-        apnea : boolean;
-        apneaAlarm : boolean;
-        apneaLagTime : 0..10000;
-        breathingCircuitConnected : boolean;
-        breathingCycleDone : boolean;
-        breathingCycleStart : boolean;
-        breathingCycleTime : 0..10000;
-        breathingTime : 0..10000;
-        breathingTimerReset : boolean;
-        buttonUnPressOr : boolean;
-        checkCommsGUI : boolean;
-        checkCommsSensors : boolean;
-        checkCommsValves : boolean;
-        confirmPSVParameters : boolean;
-        defaultParamsLoaded : boolean;
-        disableLeakCompensation : boolean;
-        displayF : 0..100;
-        displayO : 0..100;
-        displayRR : 0..100;
-        displayTV : 0..1000;
-        dropPAW : boolean;
-        enableLeakCompensation : boolean;
-        enterAlarmThresholds : boolean;
-        eraseLog : boolean;
-        error : boolean;
-        expClock : 0..10000;
-        expirationPhaseEnd : boolean;
-        expirationPhaseStart : boolean;
-        expiratoryPause : boolean;
-        expiratoryPauseButton : boolean;
-        expiratoryPhase : boolean;
-        expiratoryPhaseEnd : boolean;
-        expiratoryState : boolean;
-        gasSupplyFailure : boolean;
-        highPriorityAlarm : boolean;
-        inValveClose : boolean;
-        inValveOpen : boolean;
-        initDone : boolean;
-        initFail : boolean;
-        initStart : boolean;
-        inspClock : 0..10000;
-        inspiratoryPause : boolean;
-        inspiratoryPauseButton : boolean;
-        inspiratoryPhase : boolean;
-        inspiratoryPhaseEnd : boolean;
-        inspiratoryPhaseStart : boolean;
-        inspiratoryPressure : 0..100;
-        inspiratoryTime : 0..10000;
-        leakCompensation : boolean;
-        leakCompensationActive : boolean;
-        leakCompensationEnable : boolean;
-        loadLastParams : boolean;
-        loadLog : boolean;
-        logAlarmParams : boolean;
-        logAlarmSettings : boolean;
-        logCalibrationParams : boolean;
-        logO : boolean;
-        logParams : boolean;
-        logPatientChange : boolean;
-        logPowerSupply : boolean;
-        logPreUseCheck : boolean;
-        logVentilationParams : boolean;
-        logVentilatorSettings : boolean;
-        measureF : 0..100;
-        measureO : 0..100;
-        measurePSins : 0..100;
-        measureRR : 0..100;
-        measureTV : 0..1000;
-        minExpiratoryTime : 0..10000;
-        monitorInhaleTrigger : boolean;
-        newPatient : boolean;
-        off : boolean;
-        operator : boolean;
-        outValveClose : boolean;
-        outValveOpen : boolean;
-        paramAlarm_V : 0..100;
-        paramMax_V : 0..100;
-        paramMin_V : 0..100;
-        param_V : 0..100;
-        parametersStored : boolean;
-        patientAttributesEntered : boolean;
-        patientBreathTrigger : boolean;
-        patientBreathingRequest : boolean;
-        patientChanged : boolean;
-        patientConnected : boolean;
-        patientSafe : boolean;
-        powerButton : boolean;
-        powerConnected : boolean;
-        powerFailure : boolean;
-        powerOff : boolean;
-        powerSupplyChanged : boolean;
-        preUseCheckDone : boolean;
-        pressureSensorConnFailure : boolean;
-        pressureSensorError : boolean;
-        pressureSensorRetries : 0..10;
-        resumeVentilation : boolean;
-        runSelfTest : boolean;
-        saveLog : boolean;
-        selfTestFailed : boolean;
-        selfTestPassed : boolean;
-        startMonitoring : boolean;
-        startPCV : boolean;
-        startPSV : boolean;
-        startReportingHealthParams : boolean;
-        stopVentilation : boolean;
-        testAlarmsFail : boolean;
-        testAlarmsPass : boolean;
-        testAlarmsSkip : boolean;
-        testFL : boolean;
-        testLeaksFail : boolean;
-        testLeaksPass : boolean;
-        testLeaksSkip : boolean;
-        testOxygenSensorFail : boolean;
-        testOxygenSensorPass : boolean;
-        testOxygenSensorSkip : boolean;
-        testPSExpFail : boolean;
-        testPSExpPass : boolean;
-        testPSExpSkip : boolean;
-        testPowerSwitchFail : boolean;
-        testPowerSwitchPass : boolean;
-        testPowerSwitchSkip : boolean;
-        user : boolean;
-        ventilating : boolean;
-        ventilationOff : boolean;
-        ventilationParamsAdjustable : boolean;
-        ventilatorSettingsChanged : boolean;
-
-    LTLSPEC ({f1}) <-> ({f2})
-    """
+def check_equivalence_stlpipeline(formula1, formula2):
+    return check_equivalence("stlpipeline", formula1, formula2)
 
-    return responseHandler(model, f1, f2)
+
+def check_equivalence_lungV(formula1, formula2):
+    return check_equivalence("lungV", formula1, formula2)
 
 
 if __name__ == "__main__":
@@ -618,3 +730,7 @@ if __name__ == "__main__":
     n1 = "(H (PCVMode -> (P_insp = P_inspPCV)))"
     n2 = "H(PCVMode → (P_insp = P_inspPCV))"
     print("LungV Equivalent:", check_equivalence_lungV(n1, n2))
+
+    SESSION_POOL.report()
+    VERDICT_CACHE.report()
+    TRACE_LIBRARY.report()
@@ -0,0 +1,87 @@
+import subprocess
+import tempfile
+import threading
+import queue
+import time
+import os
+
+
+BMC_MAX_BOUND = 60
+
+# name -> (nuXmv commands, verdicts the engine can decide)
+# BMC only ever refutes, IC3 is mostly useful as a prover but decides both.
+STRATEGIES = {
+    "bdd": (["go", "check_ltlspec -P prop"], (True, False)),
+    "bmc": (["go_bmc", f"check_ltlspec_bmc_inc -k {BMC_MAX_BOUND} -P prop"], (False,)),
+    "ic3": (["go", "build_boolean_model", "check_ltlspec_ic3 -P prop"], (True, False)),
+}
+
+
+def verdict_of(output):
+    if "is true" in output:
+        return True
+    if "is false" in output:
+        return False
+    return None
+
+
+def _collect(name, proc, timeout, results):
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        stdout, stderr = proc.communicate()
+    results.put((name, stdout, stderr))
+
+
+def race(model, spec, binary, timeout, strategies=STRATEGIES):
+    """Run several nuXmv engines on `spec` at once and keep the first definitive answer.
+
+    Returns (verdict, engine name, stderr of the deciding run or of the last
+    run if none decided). Engines still running when one decides are killed.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".smv", delete=False, mode="w", encoding="utf-8") as tmp:
+        tmp.write(model + f"\n    LTLSPEC NAME prop := {spec}\n")
+        smv_path = tmp.name
+
+    scripts = {}
+    for name, (commands, _) in strategies.items():
+        with tempfile.NamedTemporaryFile(suffix=".cmd", delete=False, mode="w", encoding="utf-8") as tmp:
+            read = f'read_model -i "{smv_path.replace(os.sep, "/")}"'
+            tmp.write("\n".join([read] + commands + ["quit"]) + "\n")
+            scripts[name] = tmp.name
+
+    procs = {}
+    results = queue.Queue()
+    start = time.monotonic()
+    try:
+        for name, script_path in scripts.items():
+            procs[name] = subprocess.Popen(
+                [binary, "-source", script_path],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+        for name, proc in procs.items():
+            threading.Thread(target=_collect, args=(name, proc, timeout, results), daemon=True).start()
+
+        error_output = ""
+        for _ in procs:
+            name, stdout, stderr = results.get()
+            verdict = verdict_of(stdout)
+            error_output = stderr
+            if verdict is not None and verdict in strategies[name][1]:
+                print(f"    Portfolio: {name} decided in {time.monotonic() - start:.1f} s")
+                return verdict, name, stderr
+        return None, "portfolio", error_output
+
+    finally:
+        # Kill the losers
+        for proc in procs.values():
+            if proc.poll() is None:
+                proc.kill()
+        for path in [smv_path] + list(scripts.values()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
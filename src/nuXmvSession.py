@@ -0,0 +1,268 @@
+import subprocess
+import signal
+import tempfile
+import threading
+import queue
+import time
+import os
+import checkMetrics
+
+
+NUXMV_BINARY = "nuxmv.exe"
+SETUP_COMMANDS = ["flatten_hierarchy", "encode_variables", "build_model"]
+
+
+class NuXmvSession:
+    """A long-lived `nuXmv -int` process with one model already read and encoded."""
+
+    def __init__(self, system, model, binary=NUXMV_BINARY, timeout=45):
+        self.system = system
+        self.model = model
+        self.binary = binary
+        self.timeout = timeout
+        self.checks = 0
+        self._marker = 0
+        self._pending = None  # marker of a command that timed out and may still be running
+        self._lines = queue.Queue()
+        self._usage = {}
+        self.proc = None
+
+    def start(self):
+        with tempfile.NamedTemporaryFile(suffix=".smv", delete=False, mode="w", encoding="utf-8") as tmp:
+            tmp.write(self.model)
+            tmp_path = tmp.name
+
+        try:
+            self.proc = subprocess.Popen(
+                [self.binary, "-int"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1
+            )
+            threading.Thread(target=self._pump, daemon=True).start()
+
+            # nuXmv reads the model once, the file is not needed afterwards
+            output = self._command(f'read_model -i "{tmp_path.replace(os.sep, "/")}"')
+            for cmd in SETUP_COMMANDS:
+                output += self._command(cmd)
+        finally:
+            os.remove(tmp_path)
+
+        errors = [l for l in output.splitlines() if "error" in l.lower() and not l.startswith("***")]
+        if errors:
+            self.close()
+            raise RuntimeError(f"nuXmv could not encode the {self.system} model:\n{output}")
+
+    def _pump(self):
+        # Reader thread, pipes cannot be polled portably (nuXmv runs on Windows too)
+        for line in self.proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _command(self, cmd, timeout=None):
+        self._marker += 1
+        marker = f"__END_OF_COMMAND_{self._marker}__"
+        self.proc.stdin.write(f"{cmd}\necho {marker}\n")
+        self.proc.stdin.flush()
+        try:
+            return self._read_until(marker, cmd, timeout or self.timeout)
+        except TimeoutError:
+            self._pending = marker
+            raise
+
+    def _read_until(self, marker, cmd, timeout):
+        deadline = time.monotonic() + timeout
+        output = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(cmd)
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError(cmd)
+            if line is None:
+                raise EOFError(f"nuXmv exited while running: {cmd}")
+            if marker in line:
+                return "".join(output)
+            output.append(line)
+
+    def interrupt(self):
+        """Stop the command that timed out and wait for nuXmv to be ready again.
+
+        nuXmv aborts the running command on SIGINT and returns to its prompt;
+        where there are no signals (Windows) the command is left to finish
+        within the session timeout. Raises TimeoutError or EOFError if the
+        session does not come back, it should then be closed.
+        """
+        if self._pending is None:
+            return
+        if os.name == "posix" and self.alive:
+            self.proc.send_signal(signal.SIGINT)
+        self._read_until(self._pending, "interrupted check", self.timeout)
+        self._pending = None
+
+    def check(self, spec, timeout=None):
+        self.checks += 1
+        return self._command(f'check_ltlspec -p "{spec}"', timeout)
+
+    def usage(self):
+        """nuXmv resource figures, CPU and reordering counted since the previous call."""
+        text = "".join(self._command(cmd) for cmd in checkMetrics.STATS_COMMANDS)
+        usage = checkMetrics.parse_stats(text)
+        delta = checkMetrics.stats_delta(self._usage, usage)
+        self._usage = usage
+        return delta
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            if self.alive:
+                self.proc.stdin.write("quit\n")
+                self.proc.stdin.flush()
+                self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        finally:
+            if self.alive:
+                self.proc.kill()
+            self.proc = None
+
+
+class SessionPool:
+    """Warm nuXmv sessions per system, reused for checks on the same model text.
+
+    Up to `max_sessions` sessions of a system run at once and as many stay
+    idle; the least recently used idle one is closed when a new model needs
+    room. Sessions are recycled on crash or age. A session whose check times
+    out is interrupted and reused, it is only recycled if it does not return
+    to the prompt.
+    """
+
+    def __init__(self, binary=NUXMV_BINARY, timeout=45, max_sessions=1, max_checks=1000):
+        self.binary = binary
+        self.timeout = timeout
+        self.max_sessions = max_sessions  # per system model
+        self.max_checks = max_checks      # recycle after this many checks
+        self.idle = {}
+        self.slots = {}
+        self.latencies = {}
+        self.started = 0
+        self.reused = 0
+        self.recycled = 0
+        self.lock = threading.Lock()
+
+    def _acquire(self, system, model):
+        with self.lock:
+            slots = self.slots.setdefault(system, threading.BoundedSemaphore(self.max_sessions))
+        slots.acquire()
+
+        with self.lock:
+            idle = self.idle.setdefault(system, [])
+            # Most recently used last
+            for k in range(len(idle) - 1, -1, -1):
+                if idle[k].model == model:
+                    session = idle.pop(k)
+                    if session.alive:
+                        self.reused += 1
+                        return session
+                    session.close()
+                    self.recycled += 1
+                    break
+
+        session = NuXmvSession(system, model, self.binary, self.timeout)
+        try:
+            session.start()
+        except Exception:
+            session.close()
+            slots.release()
+            raise
+        with self.lock:
+            self.started += 1
+        return session
+
+    def _release(self, session, healthy):
+        with self.lock:
+            if healthy and session.alive and session.checks < self.max_checks:
+                idle = self.idle[session.system]
+                idle.append(session)
+                if len(idle) > self.max_sessions:
+                    idle.pop(0).close()
+                    self.recycled += 1
+            else:
+                session.close()
+                self.recycled += 1
+        self.slots[session.system].release()
+
+    def _settle(self, session):
+        try:
+            session.interrupt()
+            healthy = True
+        except (TimeoutError, EOFError, OSError) as e:
+            print(f"⚠️ NuXMV session for {session.system} did not recover from a timeout — recycling ({e})")
+            healthy = False
+        self._release(session, healthy)
+
+    def check(self, system, model, spec, timeout=None, stats=None):
+        """Run one LTL check on the warm session of `system`, returns the raw nuXmv output or None.
+
+        A check exceeding `timeout` (the pool timeout by default) raises
+        TimeoutError so the caller can escalate; the session is interrupted
+        on a background thread and goes back to the pool. A `stats` dict is
+        filled with the nuXmv resource usage of the check.
+        """
+        try:
+            session = self._acquire(system, model)
+        except (TimeoutError, EOFError, RuntimeError, OSError) as e:
+            print(f"⚠️ Could not start a NuXMV session for {system}: {e}")
+            return
+        start = time.perf_counter()
+        healthy = True
+        try:
+            if stats is not None and not session.checks:
+                session.usage()  # baseline after the model was encoded
+            output = session.check(spec, timeout)
+            if stats is not None:
+                stats.update(session.usage())
+        except TimeoutError:
+            print(f"⏳ NuXMV session for {system} timed out — interrupting the check")
+            threading.Thread(target=self._settle, args=(session,), daemon=True).start()
+            session = None
+            raise
+        except (EOFError, OSError) as e:
+            print(f"⚠️ NuXMV session for {system} crashed — recycling ({e})")
+            healthy = False
+            return
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.latencies.setdefault(system, []).append(elapsed)
+            if session is not None:
+                self._release(session, healthy)
+        return output
+
+    def report(self):
+        print(f"nuXmv session pool: {self.started} started, {self.reused} checks on a warm session, {self.recycled} recycled")
+        for system, lat in self.latencies.items():
+            lat = sorted(lat)
+            p50 = lat[len(lat) // 2]
+            p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+            print(
+                f"  {system}: {len(lat)} checks, "
+                f"mean {1000 * sum(lat) / len(lat):.1f} ms, "
+                f"p50 {1000 * p50:.1f} ms, p95 {1000 * p95:.1f} ms"
+            )
+
+    def close(self):
+        with self.lock:
+            for sessions in self.idle.values():
+                for session in sessions:
+                    session.close()
+            self.idle.clear()
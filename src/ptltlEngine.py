@@ -0,0 +1,354 @@
+import re
+import itertools
+import collections
+import ltlParser
+import modelSlicer
+import domainAbstraction
+
+
+# Larger problems are left to nuXmv
+MAX_VALUATIONS = 20000  # variable assignments enumerated per position
+MAX_STEPS = 20000  # product states x input letters explored
+
+ENUM = re.compile(r"^\{([^}]*)\}$")
+TEMPORAL = set(ltlParser.PAST) | set(ltlParser.FUTURE)
+
+
+class Unsupported(Exception):
+    pass
+
+
+def has_temporal(node):
+    return node.op in TEMPORAL or any(has_temporal(a) for a in node.args)
+
+
+def evaluate(node, env):
+    """Value of a temporal-free expression under the variable assignment `env`."""
+    op = node.op
+    if op in ("const", "num"):
+        return node.value
+    if op == "var":
+        return env[node.value]
+    if op == "neg":
+        return -evaluate(node.args[0], env)
+    values = [evaluate(a, env) for a in node.args]
+    if op in ltlParser.ARITH:
+        return ltlParser.ARITH[op](*values)
+    if op in ltlParser.COMPARE:
+        return ltlParser.COMPARE[op](*values)
+    if op == "!":
+        return not values[0]
+    if op == "&":
+        return all(values)
+    if op == "|":
+        return any(values)
+    if op == "->":
+        return not values[0] or values[1]
+    if op == "<->":
+        return values[0] == values[1]
+    if op == "xor":
+        return values[0] != values[1]
+    raise Unsupported(op)
+
+
+class Monitor:
+    """Finite-state monitor of a past-time formula.
+
+    The state holds one int per temporal subformula: the previous value of
+    its operand (Y, Z), of itself (H, O, S), or for bounded operators a bit
+    mask of which of the last `hi` positions still witness it. Atoms, the
+    maximal temporal-free subformulas, are numbered in `atoms` (shared
+    between monitors so a product reads one letter per position).
+    """
+
+    def __init__(self, node, atoms):
+        self.init = []
+        self.root = self._compile(node, atoms, {})
+        self.init = tuple(self.init)
+
+    def _slot(self, initial):
+        self.init.append(initial)
+        return len(self.init) - 1
+
+    def _compile(self, node, atoms, memo):
+        if node in memo:
+            return memo[node]
+        gate = self._gate(node, atoms, memo)
+        memo[node] = gate
+        return gate
+
+    def _gate(self, node, atoms, memo):
+        op = node.op
+        if not has_temporal(node):
+            i = atoms.setdefault(node, len(atoms))
+            return lambda letter, prev, new: letter[i]
+        if op in ltlParser.FUTURE:
+            raise Unsupported(op)
+
+        # Children are always all evaluated: short-circuiting would skip their state updates
+        gates = [self._compile(a, atoms, memo) for a in node.args]
+        if op == "!":
+            a, = gates
+            return lambda letter, prev, new: not a(letter, prev, new)
+        if op in ("&", "|", "->", "<->", "xor"):
+            combine = {
+                "&": all, "|": any,
+                "->": lambda v: not v[0] or v[1],
+                "<->": lambda v: v[0] == v[1],
+                "xor": lambda v: v[0] != v[1],
+            }[op]
+            return lambda letter, prev, new: combine([g(letter, prev, new) for g in gates])
+
+        if node.value is not None:
+            return self._bounded(op, gates, *node.value)
+
+        if op in ("Y", "Z"):
+            a, = gates
+            s = self._slot(1 if op == "Z" else 0)
+
+            def step(letter, prev, new):
+                new[s] = a(letter, prev, new)
+                return bool(prev[s])
+        elif op == "H":
+            a, = gates
+            s = self._slot(1)
+
+            def step(letter, prev, new):
+                new[s] = a(letter, prev, new) and prev[s]
+                return bool(new[s])
+        elif op == "O":
+            a, = gates
+            s = self._slot(0)
+
+            def step(letter, prev, new):
+                new[s] = a(letter, prev, new) or prev[s]
+                return bool(new[s])
+        elif op == "S":
+            a, b = gates
+            s = self._slot(0)
+
+            def step(letter, prev, new):
+                x = a(letter, prev, new)
+                new[s] = b(letter, prev, new) or (x and prev[s])
+                return bool(new[s])
+        else:
+            raise Unsupported(op)
+        return step
+
+    def _bounded(self, op, gates, lo, hi):
+        """a S[lo,hi] b holds at i if b held at some i-d with lo <= d <= hi and a since.
+
+        Bit d of `cur` says whether that is so for offset d; O[lo,hi] a is
+        TRUE S[lo,hi] a and H[lo,hi] a is ! O[lo,hi] ! a.
+        """
+        s = self._slot(0)
+        keep = (1 << hi) - 1
+        window = ((1 << (hi + 1)) - 1) ^ ((1 << lo) - 1)
+        a, b = gates if op == "S" else (None, gates[0])
+
+        def step(letter, prev, new):
+            since = a(letter, prev, new) if op == "S" else True
+            witness = b(letter, prev, new)
+            if op == "H":
+                witness = not witness
+            cur = (1 if witness else 0) | ((prev[s] << 1) if since else 0)
+            new[s] = cur & keep
+            found = bool(cur & window)
+            return not found if op == "H" else found
+        return step
+
+    def step(self, state, letter):
+        new = list(state)
+        value = self.root(letter, state, new)
+        return value, tuple(new)
+
+
+def expand_defines(node, defines, memo=None):
+    """Inline DEFINE bodies so every identifier left is a declared variable."""
+    memo = {} if memo is None else memo
+    if node in memo:
+        return memo[node]
+    if node.op == "var" and node.value in defines:
+        result = expand_defines(ltlParser.parse(defines[node.value]), defines, memo)
+    elif node.args:
+        result = ltlParser.Node(node.op, tuple(expand_defines(a, defines, memo) for a in node.args), node.value)
+    else:
+        result = node
+    memo[node] = result
+    return result
+
+
+def variable_domains(model, formulas, names):
+    variables, _ = modelSlicer.parse_model(model)
+    reduced = domainAbstraction.reduced_domains(model, formulas)
+    domains = {}
+    for name in sorted(names):
+        if name not in variables:
+            raise Unsupported(name)
+        typ = variables[name][1]
+        if name in reduced:
+            domains[name] = reduced[name]
+        elif typ == "boolean":
+            domains[name] = (False, True)
+        elif domainAbstraction.RANGE.match(typ):
+            lo, hi = (int(x) for x in domainAbstraction.RANGE.match(typ).groups())
+            domains[name] = range(lo, hi + 1)
+        elif ENUM.match(typ) and all(v.strip().lstrip("-").isdigit() for v in ENUM.match(typ).group(1).split(",")):
+            domains[name] = [int(v) for v in ENUM.match(typ).group(1).split(",")]
+        else:
+            raise Unsupported(typ)
+    return domains
+
+
+def alphabet(atoms, domains):
+    """Distinct atom valuations, each with one variable assignment producing it.
+
+    Atoms over disjoint variables are enumerated separately and combined
+    afterwards, so the cost follows the letters, not the full input space.
+    """
+    pairs = []
+    for atom in atoms:
+        names = sorted(ltlParser.identifiers(atom))
+        pairs += zip(names, names[1:])
+    groups = [[]] + [sorted(g) for g in domainAbstraction.components(list(domains), pairs)]
+
+    parts = []
+    for group in groups:
+        members = [i for i, a in enumerate(atoms) if ltlParser.identifiers(a) <= set(group)
+                   and (group or not ltlParser.identifiers(a))]
+        size = 1
+        for name in group:
+            size *= len(domains[name])
+        if size > MAX_VALUATIONS:
+            raise Unsupported(f"{size} valuations")
+        letters = {}
+        for values in itertools.product(*(domains[name] for name in group)):
+            env = dict(zip(group, values))
+            letter = tuple(evaluate(atoms[i], env) for i in members)
+            if not all(isinstance(v, bool) for v in letter):
+                raise Unsupported("non-boolean atom")
+            letters.setdefault(letter, env)
+        parts.append((members, letters))
+
+    count = 1
+    for _, letters in parts:
+        count *= len(letters)
+    if count > MAX_VALUATIONS:
+        raise Unsupported(f"{count} letters")
+
+    combined = {}
+    for choice in itertools.product(*(letters.items() for _, letters in parts)):
+        letter = [None] * len(atoms)
+        env = {}
+        for (members, _), (values, assignment) in zip(parts, choice):
+            for i, v in zip(members, values):
+                letter[i] = v
+            env.update(assignment)
+        combined[tuple(letter)] = env
+    return combined
+
+
+def default_value(typ):
+    if typ == "boolean":
+        return False
+    if domainAbstraction.RANGE.match(typ):
+        return int(domainAbstraction.RANGE.match(typ).group(1))
+    if ENUM.match(typ):
+        first = ENUM.match(typ).group(1).split(",")[0].strip()
+        return int(first) if first.lstrip("-").isdigit() else first
+    raise Unsupported(typ)
+
+
+def replay(model, f1, f2, traces, every_position=True):
+    """Index of the first trace on which f1 and f2 differ at some position, or None.
+
+    With `every_position=False` only the first position of a trace counts.
+
+    Any sequence of assignments is a path of our unconstrained models, so a
+    separating trace refutes the pair whichever check produced it. Variables
+    a trace does not mention take a fixed value of their domain.
+    """
+    try:
+        variables, defines = modelSlicer.parse_model(model)
+        n1 = expand_defines(ltlParser.parse(f1), defines)
+        n2 = expand_defines(ltlParser.parse(f2), defines)
+        names = ltlParser.identifiers(n1) | ltlParser.identifiers(n2)
+        if not names <= set(variables):
+            return None
+        defaults = {name: default_value(variables[name][1]) for name in names}
+        atoms = {}
+        m1 = Monitor(n1, atoms)
+        m2 = Monitor(n2, atoms)
+    except (ltlParser.ParseError, Unsupported):
+        return None
+    atoms = sorted(atoms, key=atoms.get)
+
+    for index, trace in enumerate(traces):
+        s1, s2 = m1.init, m2.init
+        try:
+            for position in trace:
+                env = {name: position.get(name, default) for name, default in defaults.items()}
+                letter = tuple(evaluate(a, env) for a in atoms)
+                v1, s1 = m1.step(s1, letter)
+                v2, s2 = m2.step(s2, letter)
+                if v1 != v2:
+                    return index
+                if not every_position:
+                    break
+        except (TypeError, Unsupported):
+            # Symbolic value compared as a number, or similar: this trace does not apply
+            continue
+    return None
+
+
+def check_equivalence(model, f1, f2, every_position=True):
+    """Decide whether f1 and f2 agree at every position of every trace over the
+    variables of `model` (the question nuXmv answers for G (f1 <-> f2)), or
+    with `every_position=False` at the first position (f1 <-> f2).
+
+    Returns (verdict, trace). verdict is None when a formula uses future
+    operators, something the engine cannot evaluate, or the input space is
+    too large; trace lists the variable assignments up to the first position
+    where the formulas differ when verdict is False.
+    """
+    try:
+        return _check(model, f1, f2, every_position)
+    except (ltlParser.ParseError, Unsupported):
+        return None, None
+
+
+def _check(model, f1, f2, every_position=True):
+    _, defines = modelSlicer.parse_model(model)
+    n1 = expand_defines(ltlParser.parse(f1), defines)
+    n2 = expand_defines(ltlParser.parse(f2), defines)
+    domains = variable_domains(model, [f1, f2], ltlParser.identifiers(n1) | ltlParser.identifiers(n2))
+
+    atoms = {}
+    m1 = Monitor(n1, atoms)
+    m2 = Monitor(n2, atoms)
+    letters = alphabet(sorted(atoms, key=atoms.get), domains)
+
+    # Breadth-first search of the product, so a returned trace is a shortest one
+    start = (m1.init, m2.init)
+    parent = {start: None}
+    todo = collections.deque([start])
+    steps = 0
+    while todo:
+        state = todo.popleft()
+        for letter, env in letters.items():
+            steps += 1
+            if steps > MAX_STEPS:
+                raise Unsupported("state space")
+            v1, s1 = m1.step(state[0], letter)
+            v2, s2 = m2.step(state[1], letter)
+            if v1 != v2:
+                trace = [env]
+                while parent[state] is not None:
+                    state, env = parent[state]
+                    trace.append(env)
+                return False, trace[::-1]
+            successor = (s1, s2)
+            if every_position and successor not in parent:
+                parent[successor] = (state, env)
+                todo.append(successor)
+    return True, None
@@ -1,29 +1,101 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import spot
-import random
 import csv
 import re
-import json
+import collections
+import threading
+import os
+import asyncio
+import concurrent.futures
+from typing import Optional
+import functools
+import multiprocessing
+import verdictCache
+import ltlParser
+import traceFuzzer
+import formulaValidator
+import liftedDataset
+import llmCache
 
 
 MODEL = "gpt-5-chat-latest"
-client = OpenAI()
+SPOT_ENGINE = f"spot-{spot.version()}"
+# Signals the prompt allows, generated formulas using anything else are rejected before Spot
+SIGNALS = {f"prop_{i}" for i in range(1, 8)}
+# Translated automata kept resident (formula and negation per entry), least recently used evicted
+AUTOMATA_CACHE_SIZE = 256
+# Keep MAX_IN_FLIGHT LLM requests open at once and decide with Spot on SPOT_WORKERS processes
+# (Spot holds the GIL), each reference always on the same one so its automata are reused there;
+# rows are still written in iteration order. Off with interactive bounds.
+CONCURRENT = True
+MAX_IN_FLIGHT = 8
+SPOT_WORKERS = os.cpu_count() or 1
+# Sweep mode: run every temperature on the same examples, e.g. [0, 0.1, 0.2, ..., 2] (None: one run at 0)
+TEMPERATURES = None
+# Examples are drawn from the dataset with this seed (None: different each run)
+DATASET_SEED = 0
+# Look for a separating random lasso before asking Spot
+USE_FUZZING = True
+# Ask a human about bounded formulas ([n,m]) instead of expanding them into nested X for Spot
+INTERACTIVE_BOUNDS = False
+
+
+class AutomatonCache:
+    """Spot automata of formulas and of their negations, each translated once on one bdd_dict."""
+
+    def __init__(self, capacity=AUTOMATA_CACHE_SIZE):
+        self.capacity = capacity
+        self.bdd_dict = spot.make_bdd_dict()
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.translations = 0
+
+    def get(self, formula):
+        key = str(formula)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = (
+            spot.translate(formula, dict=self.bdd_dict),
+            spot.translate(spot.formula.Not(formula), dict=self.bdd_dict),
+        )
+        with self.lock:
+            self.translations += 1
+            self.entries[key] = entry
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+        return entry
+
+    def report(self):
+        print(f"Spot automata: {self.hits} reused, {self.translations} translated")
+
+
+# The caches are opened on first use: spawned Spot workers re-import this module and must not
+# open the LLM log or the verdict database, only the parent reads and writes those
+@functools.lru_cache(maxsize=None)
+def llm_cache():
+    # Record/replay of LLM answers, mode from LLM_CACHE_MODE: read-through (default), record, replay, off
+    return llmCache.LLMCache()
+
+
+@functools.lru_cache(maxsize=None)
+def verdict_cache():
+    return verdictCache.VerdictCache()
+
+
+@functools.lru_cache(maxsize=None)
+def automata():
+    # One per process, Spot automata cannot be sent between processes
+    return AutomatonCache()
 
 
 def load_jsonl(path):
-    examples = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            obj = json.loads(line)
-
-            nl = " ".join(obj["logic_sentence"])
-            ltl = " ".join(obj["logic_ltl"])
-
-            examples.append({
-                "nl": nl.strip(),
-                "ltl": ltl.strip()
-            })
-    return examples
+    return list(liftedDataset.LiftedDataset(path))
 
 
 def normalize_ltl(formula: str) -> str:
@@ -43,40 +115,104 @@ def normalize_ltl(formula: str) -> str:
     return " ".join(f.split())
 
 
-def ltl_equivalent(f1: str, f2: str) -> bool:
-    
+def screen_pair(f1: str, f2: str):
+    """Checks that need no automata: (verdict, None) when they settle the pair,
+    else (None, the pair's verdict cache key)."""
+
+    # Only unknown signals are rejected here, Spot is the judge of its own syntax
+    problem = formulaValidator.validate(f2, SIGNALS, dialect="spot")
+    if problem is not None and problem.kind == "undeclared":
+        print(f"⚠️ Rejected generated formula {f2!r}: {problem.message}")
+        return False, None
+
+    # Identical canonical forms are equivalent without Spot, which still gets the formulas as written
+    same, _, keys = ltlParser.prepare_pair(f1, f2, dialect="spot")
+    if same:
+        return True, None
+    return None, verdictCache.make_key(*keys, "", SPOT_ENGINE)
+
+
+def decide(f1: str, f2: str) -> Optional[bool]:
+    """Fuzzing, then Spot on the expanded formulas; None when no verdict was reached."""
+
+    if USE_FUZZING and traceFuzzer.fuzz_propositional(f1, f2) is not None:
+        return False
+
     if "[" in f1 or "[" in f2:
-        print("\n⚠️ Bounded-time formula detected")
-        print("Formula 1:", f1)
-        print("Formula 2:", f2)
+        try:
+            f1, f2 = expand_bounded(f1), expand_bounded(f2)
+        except ltlParser.BoundTooLarge as e:
+            print(f"⚠️ {e}, no verdict for {f1!r} / {f2!r}")
+            return None
+        except RecursionError:
+            print(f"⚠️ Bounded operators nested too deeply to expand, no verdict for {f1!r} / {f2!r}")
+            return None
 
-        while True:
-            user = input("Are these equivalent? [t/f]: ").strip().lower()
-            if user in ("t", "true"):
-                return True
-            elif user in ("f", "false"):
-                return False
-            else:
-                print("Please enter 't' or 'f'.")
+    return spot_equivalent(f1, f2)
+
+
+def ltl_equivalent(f1: str, f2: str) -> Optional[bool]:
+    """True/False, or None when no verdict was reached (bound too large to expand, Spot error)."""
+
+    verdict, key = screen_pair(f1, f2)
+    if key is None:
+        return verdict
 
+    if INTERACTIVE_BOUNDS and ("[" in f1 or "[" in f2):
+        if USE_FUZZING and traceFuzzer.fuzz_propositional(f1, f2) is not None:
+            return False
+        return ask_equivalent(f1, f2)
+
+    verdict = verdict_cache().compute(key, lambda: decide(f1, f2), SPOT_ENGINE)
+    return None if verdict is None else bool(verdict)
+
+
+def expand_bounded(formula: str) -> str:
+    """Spot text of the formula with its bounded operators expanded (unparseable ones are kept)."""
+    try:
+        node = ltlParser.parse(formula, "spot")
+    except ltlParser.ParseError:
+        return formula
+    expanded = ltlParser.expand_bounds(node)
+    if expanded is node:
+        return formula
+    return ltlParser.to_string(expanded, "spot")
+
+
+def ask_equivalent(f1: str, f2: str) -> bool:
+    print("\n⚠️ Bounded-time formula detected")
+    print("Formula 1:", f1)
+    print("Formula 2:", f2)
+
+    while True:
+        user = input("Are these equivalent? [t/f]: ").strip().lower()
+        if user in ("t", "true"):
+            return True
+        elif user in ("f", "false"):
+            return False
+        else:
+            print("Please enter 't' or 'f'.")
+
+
+def spot_equivalent(f1: str, f2: str):
 
     try:
         phi1 = spot.formula(f1)
         phi2 = spot.formula(f2)
 
-        # Let Spot choose the cheapest automata internally
-        return spot.are_equivalent(phi1, phi2)
+        # f1 == f2 iff neither f1 & !f2 nor f2 & !f1 has an accepting run
+        a1, not_a1 = automata().get(phi1)
+        a2, not_a2 = automata().get(phi2)
+        return not a1.intersects(not_a2) and not a2.intersects(not_a1)
 
     except Exception as e:
         print("LTL error:", e)
-        return False
+        return
 
 
 
 
-def run_iteration(nl_text, reference_ltl):
-    ref_norm = normalize_ltl(reference_ltl)
-
+def completion_request(nl_text, temperature=0):
     prompt = f"""
 Convert the requirement into a valid LTL formula using operators:
 G, F, U, [n,m], &, |, ->, <->, !. Where n and m is an integer for time steps. 
@@ -87,75 +223,235 @@ Output only the formula.
 Requirement: {nl_text}
 """
 
-    answer = client.chat.completions.create(
+    return dict(
         model=MODEL,
         messages=[
             {"role": "system", "content": "You generate valid LTL formulas."},
             {"role": "user", "content": prompt}
         ],
         max_completion_tokens=256,
-        temperature=0
+        temperature=temperature
     )
 
-    generated = answer.choices[0].message.content.strip()
+
+@functools.lru_cache(maxsize=None)
+def openai_client():
+    # Created on the first cache miss, so replayed runs need no API key
+    return OpenAI()
+
+
+def ask(request):
+    answer = openai_client().chat.completions.create(**request)
+    return answer.choices[0].message.content.strip()
+
+
+def run_iteration(nl_text, reference_ltl, temperature=0, sample=0):
+    ref_norm = normalize_ltl(reference_ltl)
+
+    generated = llm_cache().complete(completion_request(nl_text, temperature), ask, sample)
     gen_norm = normalize_ltl(generated)
 
     eq = ltl_equivalent(ref_norm, gen_norm)
     return ref_norm, gen_norm, eq
 
 
+async def run_concurrent(examples, temperatures=(0,)):
+    """Async counterpart of run_iteration over many examples, yielding in example order.
+
+    Yields (ref_norm, [(gen_norm, eq) per temperature]). Up to MAX_IN_FLIGHT
+    completions are awaited at once; each answer is looked up in the verdict
+    cache here and otherwise goes to a Spot worker process, unless the same
+    (reference, generated) pair is already being checked, as happens often
+    across temperatures. Workers only decide pairs: the verdict cache and the
+    LLM log stay in this process, and each reference is always sent to the
+    same worker so its automata are translated once.
+    """
+    async_client = None
+    semaphore = asyncio.Semaphore(MAX_IN_FLIGHT)
+    loop = asyncio.get_running_loop()
+    context = multiprocessing.get_context("spawn")
+    checks = {}
+    pools = [concurrent.futures.ProcessPoolExecutor(1, mp_context=context) for _ in range(SPOT_WORKERS)]
 
-if __name__ == "__main__":
+    try:
 
-    examples = load_jsonl("lifted_data.jsonl")
-    print("Loaded", len(examples), "examples")
-    random.shuffle(examples)
+        async def generate(nl, temperature, sample):
+            nonlocal async_client
+            request = completion_request(nl, temperature)
+            content = llm_cache().lookup(request, sample)
+            if content is None:
+                if async_client is None:
+                    async_client = AsyncOpenAI()
+                async with semaphore:
+                    answer = await async_client.chat.completions.create(**request)
+                content = answer.choices[0].message.content.strip()
+                llm_cache().store(request, content, sample)
+            return normalize_ltl(content)
+
+        async def check(ref_norm, gen_norm):
+            verdict, key = screen_pair(ref_norm, gen_norm)
+            if key is None:
+                return verdict
+            verdict = verdict_cache().get(key)
+            if verdict is None:
+                pool = pools[hash(ref_norm) % len(pools)]
+                verdict = await loop.run_in_executor(pool, decide, ref_norm, gen_norm)
+                verdict_cache().put(key, verdict, SPOT_ENGINE)
+            return None if verdict is None else bool(verdict)
+
+        async def one(i, ex):
+            # The reference is normalized once for all temperatures
+            ref_norm = normalize_ltl(ex["ltl"])
+            generated = await asyncio.gather(*(generate(ex["nl"], t, i) for t in temperatures))
+            for gen_norm in generated:
+                if (ref_norm, gen_norm) not in checks:
+                    checks[ref_norm, gen_norm] = asyncio.ensure_future(check(ref_norm, gen_norm))
+            verdicts = [await checks[ref_norm, gen_norm] for gen_norm in generated]
+            return ref_norm, list(zip(generated, verdicts))
+
+        tasks = [asyncio.ensure_future(one(i, ex)) for i, ex in enumerate(examples)]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            shared = len(examples) * len(temperatures) - len(checks)
+            if len(temperatures) > 1:
+                print(f"Sweep: {len(checks)} distinct pairs checked, {shared} verdicts shared")
+    finally:
+        for pool in pools:
+            pool.shutdown()
+
+
+def iterate(examples, temperatures=(0,)):
+    """(ref_norm, [(gen_norm, eq) per temperature]) per example, in order, serially or through run_concurrent."""
+    if not CONCURRENT or INTERACTIVE_BOUNDS:
+        for i, ex in enumerate(examples):
+            runs = [run_iteration(ex["nl"], ex["ltl"], t, i) for t in temperatures]
+            yield runs[0][0], [(gen_norm, eq) for _, gen_norm, eq in runs]
+        return
+
+    loop = asyncio.new_event_loop()
+    results = run_concurrent(examples, temperatures)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
+
+
+def temperature_label(temperature):
+    # Matches the existing files: ltl_results_temp0_1.csv for 0.1
+    return f"{temperature:g}".replace(".", "_")
+
+
+def sweep(examples, temperatures):
+    """Run every temperature on the same examples, one CSV per temperature plus a combined one."""
+    header = ["true/total", "natural_language", "reference_ltl", "generated_ltl", "Equivalence Check"]
+    files = [open(f"ltl_results_temp{temperature_label(t)}.csv", "w", newline="", encoding="utf-8") for t in temperatures]
+    combined_file = open("ltl_results_sweep.csv", "w", newline="", encoding="utf-8")
+    writers = [csv.writer(f) for f in files]
+    combined = csv.writer(combined_file)
+    for writer in writers:
+        writer.writerow(header)
+    combined.writerow(["temperature"] + header)
+    true_counts = [0] * len(temperatures)
+    undecided_counts = [0] * len(temperatures)
+
+    try:
+        for i, (ex, (ref_norm, runs)) in enumerate(zip(examples, iterate(examples, temperatures))):
+            print(f"\n=== Iteration {i+1}/{len(examples)} ===")
+            print("NL:", ex["nl"])
+            print("Reference:", ref_norm)
+            for k, (t, (gen_norm, eq)) in enumerate(zip(temperatures, runs)):
+                true_counts[k] += bool(eq)
+                undecided_counts[k] += eq is None
+                row = [f"{true_counts[k]}/{i+1}", ex["nl"], ref_norm, gen_norm, eq]
+                writers[k].writerow(row)
+                combined.writerow([t] + row)
+                print(f"T={t}: {gen_norm} -> {eq}")
+            for f in files + [combined_file]:
+                f.flush()
+    finally:
+        for f in files + [combined_file]:
+            f.close()
+
+    print("\nSweep summary:")
+    for t, count, undecided in zip(temperatures, true_counts, undecided_counts):
+        print(f"  T={t}: {count} / {len(examples)} equivalent, {undecided} without a verdict")
+    print("Results saved to: ltl_results_temp*.csv and ltl_results_sweep.csv")
+
+
+if __name__ == "__main__":
 
     NUM_ITERATIONS = 100
-    true_count = 0
 
-    csv_path = "ltl_results.csv"
+    dataset = liftedDataset.LiftedDataset("lifted_data.jsonl")
+    print("Indexed", len(dataset), "examples")
+    # Only the examples used are parsed, iterations beyond the dataset size cycle through them
+    examples = dataset.sample(NUM_ITERATIONS, DATASET_SEED)
+    selected = [examples[i % len(examples)] for i in range(NUM_ITERATIONS)]
+
+    if TEMPERATURES:
+        sweep(selected, TEMPERATURES)
+    else:
+        true_count = 0
+        undecided_count = 0
+
+        csv_path = "ltl_results.csv"
 
-    with open(csv_path, mode="w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
+        with open(csv_path, mode="w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
 
-        # Header
-        writer.writerow([
-            "true/total",
-            "natural_language",
-            "reference_ltl",
-            "generated_ltl",
-            "Equivalence Check"
-        ])
+            # Header
+            writer.writerow([
+                "true/total",
+                "natural_language",
+                "reference_ltl",
+                "generated_ltl",
+                "Equivalence Check"
+            ])
 
-        for i in range(NUM_ITERATIONS):
-            ex = examples[i % len(examples)]
+            for i, (ex, (ref_norm, [(gen_norm, eq)])) in enumerate(zip(selected, iterate(selected))):
 
-            print(f"\n=== Iteration {i+1}/{NUM_ITERATIONS} ===")
+                print(f"\n=== Iteration {i+1}/{NUM_ITERATIONS} ===")
 
-            ref_norm, gen_norm, eq = run_iteration(ex["nl"], ex["ltl"])
+                if eq:
+                    true_count += 1
+                elif eq is None:
+                    undecided_count += 1
 
-            if eq:
-                true_count += 1
+                ratio = f"{true_count}/{i+1}"
 
-            ratio = f"{true_count}/{i+1}"
+                print("NL:", ex["nl"])
+                print("Reference:", ref_norm)
+                print("Generated:", gen_norm)
+                print("Equivalent:", eq)
 
-            print("NL:", ex["nl"])
-            print("Reference:", ref_norm)
-            print("Generated:", gen_norm)
-            print("Equivalent:", eq)
+                # Write CSV row
+                writer.writerow([
+                    ratio,
+                    ex["nl"],
+                    ref_norm,
+                    gen_norm,
+                    eq
+                ])
 
-            # Write CSV row
-            writer.writerow([
-                ratio,
-                ex["nl"],
-                ref_norm,
-                gen_norm,
-                eq
-            ])
+                # Ensure data is written even if interrupted
+                f.flush()
 
-            # Ensure data is written even if interrupted
-            f.flush()
+        print("\nFinal Summary:", true_count, "/", NUM_ITERATIONS, "equivalent,", undecided_count, "without a verdict")
+        print("Results saved to:", csv_path)
 
-    print("\nFinal Summary:", true_count, "/", NUM_ITERATIONS, "equivalent")
-    print("Results saved to:", csv_path)
+    llm_cache().report()
+    verdict_cache().report()
+    if CONCURRENT and not INTERACTIVE_BOUNDS:
+        print("Automaton caches were used by the Spot worker processes")
+    else:
+        automata().report()
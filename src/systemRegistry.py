@@ -0,0 +1,82 @@
+import json
+import os
+import functools
+
+
+SYSTEMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "systemModels.json")
+
+# Each system lists its variables once. An entry has a name and either an SMV
+# `type` (declared in `section`, VAR by default) or a `define` expression.
+# Entries with a `role` also appear in the LLM variable table as
+# "name (role, kind): description"; entries may repeat a name to add table rows.
+
+
+@functools.lru_cache(maxsize=None)
+def load_systems(path=SYSTEMS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def system_names():
+    return list(load_systems())
+
+
+def get_system(name):
+    systems = load_systems()
+    if name not in systems:
+        raise KeyError(f"Unknown system {name!r}, expected one of: {', '.join(systems)}")
+    return systems[name]
+
+
+@functools.lru_cache(maxsize=None)
+def smv_header(name):
+    """SMV model without specifications, built once per process."""
+    sections = {"IVAR": [], "VAR": [], "FROZENVAR": [], "DEFINE": []}
+    declared = set()
+    for var in get_system(name)["variables"]:
+        if var["name"] in declared or ("type" not in var and "define" not in var):
+            continue
+        declared.add(var["name"])
+        if "define" in var:
+            line = f"        {var['name']} := {var['define']};"
+            section = "DEFINE"
+        else:
+            line = f"        {var['name']} : {var['type']};"
+            section = var.get("section", "VAR")
+        if var.get("comment"):
+            line += f" -- {var['comment']}"
+        sections[section].append(line)
+
+    lines = ["", "    MODULE main"]
+    for section, decls in sections.items():
+        if decls:
+            lines += [f"    {section}"] + decls + [""]
+    return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=None)
+def variable_table(name, only=None):
+    """Variable mapping table embedded in the LLM prompt, restricted to the names in `only` if given."""
+    table = "Variable Mapping Table:\n------------------------\n"
+    for var in get_system(name)["variables"]:
+        if "role" not in var or (only is not None and var["name"] not in only):
+            continue
+        table += f"{var['name']} ({var['role']}, {var['kind']})"
+        if "description" in var:
+            table += f": {var['description']}"
+        table += "\n"
+    return table
+
+
+@functools.lru_cache(maxsize=None)
+def input_variables(name):
+    """Variables whose every table row has the Input role."""
+    roles = {}
+    for var in get_system(name)["variables"]:
+        if "role" in var:
+            roles.setdefault(var["name"], set()).add(var["role"])
+    return frozenset(n for n, r in roles.items() if r == {"Input"})
+
+
+def requirements_path(name):
+    return get_system(name).get("requirements")
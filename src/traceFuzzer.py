@@ -0,0 +1,210 @@
+import numpy as np
+import ltlParser
+import ptltlEngine
+import modelSlicer
+
+
+NUM_TRACES = 2000
+TRACE_LENGTH = 24
+SEED = 0
+
+
+class Evaluator:
+    """Evaluates formulas over a batch of traces at once.
+
+    Every subformula becomes a (traces, positions) array. Past operators are
+    evaluated on the finite traces: H is a cumulative AND and O a cumulative
+    OR along the time axis, Y and Z shift it, S is a scan. Future operators
+    are evaluated on lassos, each trace looping back from its last position
+    to `loop[k]`: X follows the successor index, G, F and U are fixpoints
+    reached within `length` iterations.
+    """
+
+    def __init__(self, env, count, length, loop=None):
+        self.env = env
+        self.count = count
+        self.length = length
+        self.memo = {}
+        if loop is not None:
+            succ = np.tile(np.arange(1, self.length + 1), (self.count, 1))
+            succ[:, -1] = loop
+            self.succ = succ
+
+    def full(self, value):
+        return np.full((self.count, self.length), value)
+
+    def shift(self, a, k, fill):
+        """a shifted k positions towards the future, positions before the trace start get `fill`."""
+        if k == 0:
+            return a
+        if k >= self.length:
+            return self.full(fill)
+        out = np.empty_like(a)
+        out[:, :k] = fill
+        out[:, k:] = a[:, :-k]
+        return out
+
+    def advance(self, a):
+        return np.take_along_axis(a, self.succ, axis=1)
+
+    def eval(self, node):
+        if node not in self.memo:
+            self.memo[node] = self._eval(node)
+        return self.memo[node]
+
+    def _eval(self, node):
+        op = node.op
+        if op in ("const", "num"):
+            return self.full(node.value)
+        if op == "var":
+            if node.value not in self.env:
+                raise ptltlEngine.Unsupported(node.value)
+            return self.env[node.value]
+        if op == "neg":
+            return -self.eval(node.args[0])
+        args = [self.eval(a) for a in node.args]
+        if op in ltlParser.ARITH or op in ltlParser.COMPARE:
+            return (ltlParser.ARITH.get(op) or ltlParser.COMPARE[op])(*args)
+        if any(a.dtype != bool for a in args):
+            # Numbers used as truth values, nuXmv rejects these
+            raise ptltlEngine.Unsupported(op)
+        if op == "!":
+            return ~args[0]
+        if op == "&":
+            return np.logical_and.reduce(args)
+        if op == "|":
+            return np.logical_or.reduce(args)
+        if op == "->":
+            return ~args[0] | args[1]
+        if op == "<->":
+            return args[0] == args[1]
+        if op == "xor":
+            return args[0] != args[1]
+        if op in ltlParser.PAST:
+            return self._past(op, args, node.value)
+        if op in ltlParser.FUTURE:
+            return self._future(op, args, node.value)
+        raise ptltlEngine.Unsupported(op)
+
+    def _past(self, op, args, bound):
+        if op == "Y":
+            return self.shift(args[0], 1, False)
+        if op == "Z":
+            return self.shift(args[0], 1, True)
+        if bound is None:
+            if op == "H":
+                return np.logical_and.accumulate(args[0], axis=1)
+            if op == "O":
+                return np.logical_or.accumulate(args[0], axis=1)
+            a, b = args
+            out = b.copy()
+            for t in range(1, self.length):
+                out[:, t] |= a[:, t] & out[:, t - 1]
+            return out
+
+        # Same witness windows as ptltlEngine.Monitor._bounded
+        lo, hi = bound
+        if op == "H":
+            a, b = self.full(True), ~args[0]
+        elif op == "O":
+            a, b = self.full(True), args[0]
+        else:
+            a, b = args
+        found = self.full(False)
+        witness = b
+        for d in range(min(hi, self.length - 1) + 1):
+            if d > 0:
+                witness = self.shift(witness, 1, False) & a
+            if d >= lo:
+                found = found | witness
+        return ~found if op == "H" else found
+
+    def _future(self, op, args, bound):
+        if not hasattr(self, "succ"):
+            raise ptltlEngine.Unsupported(op)
+        if op == "X":
+            return self.advance(args[0])
+        a, b = (self.full(True), args[0]) if op in ("F", "G") else args
+        if op == "G":
+            b = ~b
+        if bound is None:
+            # Least fixpoint of b | (a & X result); G is its dual
+            out = b
+            for _ in range(self.length):
+                out = b | (a & self.advance(out))
+        else:
+            lo, hi = bound
+            out = self.full(False)
+            prefix = self.full(True)
+            for k in range(hi + 1):
+                if k >= lo:
+                    out = out | (prefix & b)
+                prefix = prefix & a
+                a, b = self.advance(a), self.advance(b)
+        return ~out if op == "G" else out
+
+
+def sample_traces(domains, count, length, rng):
+    return {
+        name: np.asarray(list(values))[rng.integers(0, len(values), size=(count, length))]
+        for name, values in domains.items()
+    }
+
+
+def fuzz(n1, n2, domains, count=NUM_TRACES, length=TRACE_LENGTH, seed=SEED, every_position=True):
+    """Look for a random trace on which the parsed formulas n1 and n2 differ.
+
+    Returns (trace, loop) for the first separating trace found: trace lists
+    the variable assignments up to the position where the formulas differ
+    (past formulas), or the whole lasso looping back to position `loop`
+    (future formulas, loop is None otherwise). Returns None if no sampled
+    trace separates them or a formula mixes past and future operators.
+    `every_position=False` compares past formulas at the first position only
+    (future formulas are compared everywhere, every suffix being a trace too).
+    """
+    ops = ltlParser.operators(n1) | ltlParser.operators(n2)
+    future = bool(ops & set(ltlParser.FUTURE))
+    if future and ops & set(ltlParser.PAST):
+        return None
+
+    rng = np.random.default_rng(seed)
+    env = sample_traces(domains, count, length, rng)
+    loop = rng.integers(0, length, size=count) if future else None
+    evaluator = Evaluator(env, count, length, loop)
+    try:
+        differ = evaluator.eval(n1) != evaluator.eval(n2)
+    except (ptltlEngine.Unsupported, TypeError):
+        return None
+    if differ.dtype == bool and not future and not every_position:
+        differ = differ[:, :1]
+    if differ.dtype != bool or not differ.any():
+        return None
+
+    k, position = np.argwhere(differ)[0]
+    end = length if future else position + 1
+    trace = [{name: env[name][k, t].item() for name in env} for t in range(end)]
+    return trace, (int(loop[k]) if future else None)
+
+
+def fuzz_model(model, f1, f2, count=NUM_TRACES, length=TRACE_LENGTH, every_position=True):
+    """fuzz() for nuXmv formulas over the variables of an SMV model (DEFINEs inlined)."""
+    try:
+        _, defines = modelSlicer.parse_model(model)
+        n1 = ptltlEngine.expand_defines(ltlParser.parse(f1), defines)
+        n2 = ptltlEngine.expand_defines(ltlParser.parse(f2), defines)
+        names = ltlParser.identifiers(n1) | ltlParser.identifiers(n2)
+        domains = ptltlEngine.variable_domains(model, [f1, f2], names)
+    except (ltlParser.ParseError, ptltlEngine.Unsupported):
+        return None
+    return fuzz(n1, n2, domains, count, length, every_position=every_position)
+
+
+def fuzz_propositional(f1, f2, count=NUM_TRACES, length=TRACE_LENGTH):
+    """fuzz() for Spot formulas, every atomic proposition a free boolean."""
+    try:
+        n1 = ltlParser.parse(f1, "spot")
+        n2 = ltlParser.parse(f2, "spot")
+    except ltlParser.ParseError:
+        return None
+    names = ltlParser.identifiers(n1) | ltlParser.identifiers(n2)
+    return fuzz(n1, n2, {name: (False, True) for name in sorted(names)}, count, length)
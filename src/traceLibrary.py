@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+import json
+import time
+import re
+import verdictCache
+
+
+MAX_TRACES_PER_REFERENCE = 20
+
+TRACE_HEADER = re.compile(r"->\s*(State|Input):\s*\d+\.(\d+)\s*<-")
+ASSIGNMENT = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_$#.]*)\s*=\s*(\S+)\s*$")
+
+
+def parse_value(text):
+    if text in ("TRUE", "FALSE"):
+        return text == "TRUE"
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+
+def parse_counterexample(output):
+    """First counterexample in nuXmv `output` as a list of {variable: value}, one per position.
+
+    nuXmv only prints the variables that changed, so values are carried
+    forward. The inputs printed before state k label the transition out of
+    state k-1 and belong to that position. A lasso loop is unrolled once.
+    Returns None if the output holds no counterexample.
+    """
+    if "is false" not in output:
+        return None
+    body = output.split("is false", 1)[1]
+
+    states, inputs = [], {}
+    values, current_inputs = {}, {}
+    loop_start = None
+    block = None
+    for line in body.splitlines():
+        if "-- specification" in line or line.startswith("@@"):
+            break
+        if "Loop starts here" in line:
+            loop_start = len(states)
+            continue
+        header = TRACE_HEADER.search(line)
+        if header:
+            block = header.group(1)
+            if block == "State":
+                values = dict(values)
+                states.append(values)
+            else:
+                current_inputs = dict(current_inputs)
+                inputs[len(states) - 1] = current_inputs
+            continue
+        m = ASSIGNMENT.match(line)
+        if m and block is not None:
+            target = values if block == "State" else current_inputs
+            target[m.group(1)] = parse_value(m.group(2))
+
+    if not states:
+        return None
+    trace = [dict(state, **inputs.get(k, current_inputs)) for k, state in enumerate(states)]
+    if loop_start is not None:
+        trace += trace[loop_start:]
+    return trace
+
+
+class TraceLibrary:
+    """Counterexamples of earlier checks, stored per system model and reference formula.
+
+    A stored trace separating a new candidate from the same reference
+    refutes it without a model checker call. Traces that refute often are
+    tried first; the least useful are dropped beyond the per-reference limit.
+    """
+
+    def __init__(self, path=verdictCache.CACHE_PATH, max_per_reference=MAX_TRACES_PER_REFERENCE):
+        self.max_per_reference = max_per_reference
+        self.lock = threading.Lock()
+        self.refuted = 0
+        self.missed = 0
+        self.added = 0
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS traces ("
+            "id INTEGER PRIMARY KEY, model TEXT NOT NULL, reference TEXT NOT NULL, "
+            "trace TEXT NOT NULL, hits INTEGER NOT NULL DEFAULT 0, added REAL NOT NULL, "
+            "UNIQUE (model, reference, trace))"
+        )
+        self.db.commit()
+
+    def get(self, model, reference):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT id, trace FROM traces WHERE model = ? AND reference = ? ORDER BY hits DESC, added DESC",
+                (verdictCache.model_hash(model), reference)
+            ).fetchall()
+        return [(trace_id, json.loads(trace)) for trace_id, trace in rows]
+
+    def add(self, model, reference, trace):
+        if not trace:
+            return
+        key = (verdictCache.model_hash(model), reference)
+        with self.lock:
+            cursor = self.db.execute(
+                "INSERT OR IGNORE INTO traces (model, reference, trace, added) VALUES (?, ?, ?, ?)",
+                key + (json.dumps(trace, sort_keys=True), time.time())
+            )
+            self.added += cursor.rowcount
+            self.db.execute(
+                "DELETE FROM traces WHERE model = ? AND reference = ? AND id NOT IN "
+                "(SELECT id FROM traces WHERE model = ? AND reference = ? ORDER BY hits DESC, added DESC LIMIT ?)",
+                key + key + (self.max_per_reference,)
+            )
+            self.db.commit()
+
+    def record(self, trace_id):
+        """Count a lookup: `trace_id` is the trace that refuted the pair, or None."""
+        with self.lock:
+            if trace_id is None:
+                self.missed += 1
+                return
+            self.refuted += 1
+            self.db.execute("UPDATE traces SET hits = hits + 1 WHERE id = ?", (trace_id,))
+            self.db.commit()
+
+    def report(self):
+        total = self.refuted + self.missed
+        rate = 100 * self.refuted / total if total else 0.0
+        with self.lock:
+            size = self.db.execute("SELECT COUNT(*) FROM traces").fetchone()[0]
+        print(
+            f"Trace library: {self.refuted} of {total} pairs refuted by replay ({rate:.1f}%), "
+            f"{self.added} traces added, {size} stored"
+        )
+
+    def close(self):
+        with self.lock:
+            self.db.close()
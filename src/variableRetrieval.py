@@ -0,0 +1,88 @@
+import math
+import re
+import systemRegistry
+
+
+TOP_PER_REQUIREMENT = 25  # best-scoring variables kept for every requirement of a chunk
+MARGIN = 10  # further variables per requirement, in case the wording does not match a description
+FULL_TABLE_BELOW = 30  # smaller systems always get their whole table
+K1 = 1.2
+B = 0.75
+
+WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+STOPWORDS = {
+    "a", "an", "and", "any", "at", "be", "by", "for", "from", "has", "have", "if", "in", "is", "it",
+    "of", "on", "or", "shall", "should", "that", "the", "then", "this", "to", "true", "when", "whenever",
+    "while", "will", "with",
+}
+
+
+def terms(text):
+    """Lower-case words of a text, with identifiers split at case changes, digits and underscores."""
+    words = []
+    for token in re.findall(r"[A-Za-z0-9_]+", text):
+        parts = [p.lower() for p in WORD.findall(token)]
+        words += parts
+        if len(parts) > 1:
+            words.append(token.lower())
+    return [w for w in words if w not in STOPWORDS]
+
+
+class VariableIndex:
+    """BM25 index over a system's variable table rows (names count twice, descriptions once)."""
+
+    def __init__(self, system):
+        self.system = system
+        self.names = []
+        docs = {}
+        for var in systemRegistry.get_system(system)["variables"]:
+            if "role" not in var:
+                continue
+            if var["name"] not in docs:
+                self.names.append(var["name"])
+                docs[var["name"]] = terms(var["name"]) * 2
+            docs[var["name"]] += terms(var.get("description", ""))
+
+        self.docs = {name: {} for name in self.names}
+        for name, words in docs.items():
+            for w in words:
+                self.docs[name][w] = self.docs[name].get(w, 0) + 1
+        self.lengths = {name: len(words) for name, words in docs.items()}
+        self.average = sum(self.lengths.values()) / max(1, len(self.lengths))
+        df = {}
+        for counts in self.docs.values():
+            for w in counts:
+                df[w] = df.get(w, 0) + 1
+        n = len(self.names)
+        self.idf = {w: math.log(1 + (n - d + 0.5) / (d + 0.5)) for w, d in df.items()}
+
+    def scores(self, text):
+        query = set(terms(text))
+        lowered = text.lower()
+        out = {}
+        for name, counts in self.docs.items():
+            score = 0.0
+            norm = K1 * (1 - B + B * self.lengths[name] / self.average)
+            for w in query & counts.keys():
+                tf = counts[w]
+                score += self.idf[w] * tf * (K1 + 1) / (tf + norm)
+            if name.lower() in lowered:
+                # Requirement names the variable outright
+                score += 100.0
+            if score > 0:
+                out[name] = score
+        return out
+
+    def select(self, texts, top=TOP_PER_REQUIREMENT, margin=MARGIN):
+        """Variables relevant to any of the texts, in table order."""
+        if len(self.names) < FULL_TABLE_BELOW:
+            return list(self.names)
+        chosen = set()
+        for text in texts:
+            ranked = sorted(self.scores(text).items(), key=lambda item: -item[1])
+            chosen |= {name for name, _ in ranked[:top + margin]}
+        return [name for name in self.names if name in chosen]
+
+    def table(self, texts):
+        """The variable mapping table restricted to the variables selected for `texts`."""
+        return systemRegistry.variable_table(self.system, frozenset(self.select(texts)))
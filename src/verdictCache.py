@@ -0,0 +1,132 @@
+import sqlite3
+import hashlib
+import threading
+import time
+
+
+CACHE_PATH = "verdict_cache.sqlite"
+MAX_ENTRIES = 200000
+
+
+def model_hash(model: str) -> str:
+    return hashlib.sha256(model.encode("utf-8")).hexdigest()
+
+
+def make_key(f1: str, f2: str, model: str, engine: str) -> str:
+    # Equivalence is symmetric, so the pair is sorted before hashing
+    a, b = sorted((f1, f2))
+    raw = "\x00".join([a, b, model_hash(model), engine])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class VerdictCache:
+    """Disk-backed, size-bounded LRU cache of equivalence verdicts.
+
+    Work in flight is deduplicated: a second thread asking for a key that is
+    being computed waits for the first one instead of running the checker.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evicted = 0
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            "key TEXT PRIMARY KEY, verdict INTEGER NOT NULL, engine TEXT, last_used REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS verdicts_lru ON verdicts(last_used)")
+        self.db.commit()
+
+    def get(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT verdict FROM verdicts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.db.execute("UPDATE verdicts SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+            return bool(row[0])
+
+    def put(self, key, verdict, engine=""):
+        # Only definitive answers are cached, timeouts and errors are retried next time
+        if verdict is None:
+            return
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO verdicts (key, verdict, engine, last_used) VALUES (?, ?, ?, ?)",
+                (key, int(verdict), engine, time.time())
+            )
+            count = self.db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+            if count > self.max_entries:
+                # Evict the least recently used tenth in one go
+                excess = count - self.max_entries + self.max_entries // 10
+                self.db.execute(
+                    "DELETE FROM verdicts WHERE key IN "
+                    "(SELECT key FROM verdicts ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                self.evicted += excess
+            self.db.commit()
+
+    def begin(self, key):
+        """Claim `key` for computation. Returns False if another worker already owns it."""
+        with self.lock:
+            if key in self.inflight:
+                return False
+            self.inflight[key] = threading.Event()
+            return True
+
+    def finish(self, key, verdict, engine=""):
+        self.put(key, verdict, engine)
+        with self.lock:
+            event = self.inflight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def wait(self, key):
+        with self.lock:
+            event = self.inflight.get(key)
+            self.waits += 1
+        if event is not None:
+            event.wait()
+        with self.lock:
+            row = self.db.execute("SELECT verdict FROM verdicts WHERE key = ?", (key,)).fetchone()
+        return None if row is None else bool(row[0])
+
+    def compute(self, key, fn, engine=""):
+        """Return the cached verdict for `key`, or run `fn()` once and cache its result."""
+        verdict = self.get(key)
+        if verdict is not None:
+            return verdict
+
+        if not self.begin(key):
+            return self.wait(key)
+
+        verdict = None
+        try:
+            verdict = fn()
+        finally:
+            self.finish(key, verdict, engine)
+        return verdict
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0.0
+        with self.lock:
+            size = self.db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+        print(
+            f"Verdict cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), "
+            f"{self.waits} waited on in-flight checks, {self.evicted} evicted, {size} entries"
+        )
+
+    def close(self):
+        with self.lock:
+            self.db.close()